@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Volume of Revolution Calculator - benchmarks
+
+Times the hot paths of the engine (volume integration, expression parsing,
+mesh generation and STL/3MF/PLY writing) on fixed cases with closed-form volumes, and
+records wall time, integrand evaluations, peak traced memory and accuracy:
+
+    python benchmarks/bench_volume.py --output bench.json
+    python benchmarks/bench_volume.py --compare baseline.json           # run, then compare
+    python benchmarks/bench_volume.py --compare baseline.json bench.json # compare two runs
+
+Comparisons flag a case as a regression when its time or peak memory grows
+by more than --threshold (a fraction; growth under 1 ms or 64 KiB is
+ignored), when it needs more evaluations, or when its error grows beyond
+noise. The exit status is 1 if any case regressed.
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+import tracemalloc
+from math import pi
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import volume_engine
+from volume_engine import (INTEGRATORS, STL_AVAILABLE, build_stl_mesh, compute_volume,
+                           parse_functions, revolution_mesh, write_indexed_mesh,
+                           write_revolution_stl)
+
+# (name, functions, revolve index, a, b, axis, method, exact volume)
+VOLUME_CASES = [
+    ("disk-x2", ["x**2"], 0, 0.0, 2.0, "x", "disk", 32 * pi / 5),
+    ("washer-2fn", ["x+1", "x"], 0, 0.0, 2.0, "x", "washer", 6 * pi),
+    ("washer-3fn", ["x+2", "x", "1"], 0, 0.0, 2.0, "x", "washer", 14 * pi),
+    ("disk-sin", ["sin(x)+2"], 0, 0.0, pi, "x", "disk", pi * (pi / 2 + 8 + 4 * pi)),
+    ("shell-x2", ["x**2"], 0, 0.0, 2.0, "y", "disk", 8 * pi),
+    ("shell-2fn", ["4", "x**2"], 0, 0.0, 2.0, "y", "washer", 8 * pi),
+    ("washer-cross", ["x", "x**2"], 0, 0.0, 2.0, "x", "washer", 4 * pi),
+    ("shell-cross", ["x", "x**2"], 0, 0.0, 2.0, "y", "washer", 3 * pi),
+]
+
+RIEMANN_STEPS = [1e-3, 1e-5, 1e-7]
+QUICK_RIEMANN_STEPS = [1e-3, 1e-5]
+TOLERANCE = 1e-9
+
+PARSE_EXPRESSIONS = ["x**2", "sin(x)+2", "sqrt(x)*exp(-x)", "np.log(x+1)", "x^3 - 2*x + 1",
+                     "arctan(x)/(1+x**2)", "abs(cos(3*x))", "log10(x+2)"]
+
+MESH_CASE = (["x+1", "x"], 0, 0.0, 2.0, "x", "washer", 6 * pi)
+STL_RESOLUTIONS = [50, 200, 800]
+QUICK_STL_RESOLUTIONS = [50, 200]
+MESH_TOLERANCES = [1e-2, 1e-3, 1e-4]
+STREAM_RESOLUTIONS = [1000, 2000]
+QUICK_STREAM_RESOLUTIONS = [1000]
+
+# Changes treated as noise when comparing runs: relative error growth, and
+# absolute growth in time and memory of very small cases
+ERROR_NOISE = 1e-12
+TIME_NOISE = 1e-3
+MEMORY_NOISE = 64 * 1024
+
+
+def measure(func, repeat):
+    """Best wall time of repeat calls, plus the peak traced memory of one more call
+
+    Returns (seconds, peak_bytes, value of the last call).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is traced separately because tracemalloc slows allocation down
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak, value
+
+
+def mesh_volume(indexed_mesh):
+    """Volume enclosed by a closed triangle mesh (divergence theorem)"""
+    v0, v1, v2 = (indexed_mesh.vertices[indexed_mesh.faces[:, i]] for i in range(3))
+    return abs(np.einsum('ij,ij->i', v0, np.cross(v1, v2)).sum()) / 6
+
+
+def record(group, name, seconds, peak, **fields):
+    entry = {"group": group, "name": name, "seconds": seconds, "peak_bytes": peak}
+    entry.update(fields)
+    return entry
+
+
+def accuracy(value, exact):
+    return {"value": value, "exact": exact, "rel_error": abs(value - exact) / abs(exact)}
+
+
+def bench_volumes(repeat, quick):
+    results = []
+    for name, func_strs, revolve_index, a, b, axis, method, exact in VOLUME_CASES:
+        funcs = parse_functions(func_strs)
+        runs = [("riemann", dx) for dx in (QUICK_RIEMANN_STEPS if quick else RIEMANN_STEPS)]
+        runs += [(integrator, 0.01) for integrator in INTEGRATORS if integrator != "riemann"]
+        for integrator, dx in runs:
+            seconds, peak, result = measure(
+                lambda: compute_volume(funcs, revolve_index, a, b, dx, axis, method,
+                                       integrator, TOLERANCE), repeat)
+            label = f"{integrator} dx={dx:g}" if integrator == "riemann" else integrator
+            results.append(record("volume", f"{name} {label}", seconds, peak,
+                                  evaluations=result.evaluations,
+                                  integrator=result.integrator,
+                                  **accuracy(result.volume, exact)))
+    return results
+
+
+def bench_parsing(repeat):
+    def cold():
+        volume_engine._compile_normalized.cache_clear()
+        return parse_functions(PARSE_EXPRESSIONS)
+
+    # Make sure SymPy's own import is not part of the measurement
+    parse_functions(["x"])
+    results = []
+    seconds, peak, _ = measure(cold, repeat)
+    results.append(record("parse", f"parse {len(PARSE_EXPRESSIONS)} expressions (cold)",
+                          seconds, peak))
+    seconds, peak, _ = measure(lambda: parse_functions(PARSE_EXPRESSIONS), repeat)
+    results.append(record("parse", f"parse {len(PARSE_EXPRESSIONS)} expressions (cached)",
+                          seconds, peak))
+    return results
+
+
+def bench_meshes(repeat, quick, directory):
+    func_strs, revolve_index, a, b, axis, method, exact = MESH_CASE
+    funcs = parse_functions(func_strs)
+    filename = os.path.join(directory, "bench.stl")
+    results = []
+
+    if STL_AVAILABLE:
+        for resolution in (QUICK_STL_RESOLUTIONS if quick else STL_RESOLUTIONS):
+            seconds, peak, stl_mesh = measure(
+                lambda: build_stl_mesh(funcs, revolve_index, a, b, axis, resolution), repeat)
+            results.append(record("mesh", f"generate_stl_mesh n={resolution}", seconds, peak,
+                                  triangles=len(stl_mesh.vectors)))
+
+    for tolerance in MESH_TOLERANCES:
+        seconds, peak, indexed_mesh = measure(
+            lambda: revolution_mesh(funcs, revolve_index, a, b, axis, method,
+                                    "adaptive", mesh_tolerance=tolerance), repeat)
+        results.append(record("mesh", f"adaptive mesh tol={tolerance:g}", seconds, peak,
+                              triangles=len(indexed_mesh.faces),
+                              **accuracy(mesh_volume(indexed_mesh), exact)))
+
+        for file_format in ("stl", "3mf", "ply"):
+            path = os.path.join(directory, f"bench.{file_format}")
+            seconds, peak, triangles = measure(
+                lambda: write_indexed_mesh(path, indexed_mesh), repeat)
+            name = f"write adaptive {file_format.upper()} tol={tolerance:g}"
+            results.append(record("stl" if file_format == "stl" else "export", name, seconds,
+                                  peak, triangles=triangles, bytes=os.path.getsize(path)))
+
+    for resolution in (QUICK_STREAM_RESOLUTIONS if quick else STREAM_RESOLUTIONS):
+        seconds, peak, triangles = measure(
+            lambda: write_revolution_stl(filename, funcs, revolve_index, a, b, axis, method,
+                                         "uniform", resolution), repeat)
+        results.append(record("stl", f"stream uniform STL n={resolution}", seconds, peak,
+                              triangles=triangles, bytes=os.path.getsize(filename)))
+    return results
+
+
+def run_benchmarks(repeat=3, quick=False):
+    """Run every benchmark group and return the report dict"""
+    with tempfile.TemporaryDirectory() as directory:
+        results = bench_parsing(repeat)
+        results += bench_volumes(repeat, quick)
+        results += bench_meshes(repeat, quick, directory)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Lines describing each case that regressed from baseline to current"""
+    previous = {entry["name"]: entry for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        old = previous.get(entry["name"])
+        if old is None:
+            continue
+        problems = []
+        for field, label, noise in (("seconds", "time", TIME_NOISE),
+                                    ("peak_bytes", "peak memory", MEMORY_NOISE)):
+            if old[field] > 0 and entry[field] > old[field] * (1 + threshold) + noise:
+                problems.append(f"{label} {old[field]:.4g} -> {entry[field]:.4g} "
+                                f"(+{entry[field] / old[field] - 1:.0%})")
+        if entry.get("evaluations", 0) > old.get("evaluations", 0):
+            problems.append(f"evaluations {old['evaluations']:,} -> {entry['evaluations']:,}")
+        if "rel_error" in entry and "rel_error" in old:
+            if entry["rel_error"] > old["rel_error"] * (1 + threshold) + ERROR_NOISE:
+                problems.append(f"error {old['rel_error']:.3e} -> {entry['rel_error']:.3e}")
+        if problems:
+            regressions.append(f"{entry['name']}: {'; '.join(problems)}")
+    return regressions
+
+
+def print_results(report):
+    for entry in report["results"]:
+        line = f"{entry['name']:<45} {entry['seconds'] * 1000:10.2f} ms {entry['peak_bytes'] / 2**20:9.2f} MiB"
+        if "evaluations" in entry:
+            line += f" {entry['evaluations']:>12,} evals"
+        if "rel_error" in entry:
+            line += f"  rel err {entry['rel_error']:.2e}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark volume integration, parsing and meshing")
+    parser.add_argument("--output", "-o", help="write the results to this JSON file")
+    parser.add_argument("--repeat", "-r", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument("--quick", action="store_true", help="skip the slowest cases")
+    parser.add_argument("--compare", nargs="+", metavar=("BASELINE", "CURRENT"),
+                        help="compare against a baseline run (a new run unless CURRENT is given)")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed relative growth in time, memory and error (default 0.2)")
+    args = parser.parse_args(argv)
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one current results file")
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as fh:
+            report = json.load(fh)
+    else:
+        report = run_benchmarks(args.repeat, args.quick)
+        print_results(report)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+    if not args.compare:
+        return 0
+    with open(args.compare[0]) as fh:
+        baseline = json.load(fh)
+    regressions = compare(baseline, report, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"No regressions against {args.compare[0]}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
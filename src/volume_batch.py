@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Volume of Revolution Calculator - parallel parameter sweeps
+
+Expands a sweep spec into jobs and runs them across a process pool, streaming
+one JSON line per finished job to the output file:
+
+    python volume_batch.py sweep.json results.jsonl --workers 32
+
+A sweep spec is {"base": {job fields}, "grid": {field: [values, ...]}}; every
+combination of the grid values is run on top of the base fields. A plain jobs
+file (as accepted by volume_cli.py) also works. Re-running with the same
+output file skips the jobs it already contains, so an interrupted sweep
+resumes where it stopped.
+
+With --export the same pool also meshes every job and writes it to the
+output directory as STL, 3MF or PLY:
+
+    python volume_batch.py jobs.json results.jsonl --export 3mf -d meshes
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import concurrent.futures
+
+from volume_engine import MESH_FORMATS, job_from_spec, run_job
+from volume_cli import load_job_specs
+
+# Chunks in flight per worker; keeps the pool busy without queueing every job up front
+CHUNKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = 64
+
+
+def expand_sweep(sweep):
+    """Job specs for every combination of the sweep's grid values"""
+    base = dict(sweep.get("base", {}))
+    grid = sweep.get("grid", {})
+    fields = sorted(grid)
+    specs = []
+    for values in itertools.product(*(grid[field] for field in fields)):
+        spec = dict(base, **dict(zip(fields, values)))
+        specs.append(spec)
+    return specs
+
+
+def load_sweep_specs(path):
+    """Job specs of a sweep spec file, or of a plain JSON/CSV jobs file"""
+    if path.lower().endswith(".csv"):
+        return load_job_specs(path)
+    with open(path) as fh:
+        sweep = json.load(fh)
+    if isinstance(sweep, dict) and "grid" in sweep:
+        return expand_sweep(sweep)
+    return load_job_specs(path)
+
+
+def export_specs(specs, file_format):
+    """Job specs that also write their mesh, in file_format unless they name a file or format"""
+    return [dict(spec, stl=spec.get("stl") or "true", format=spec.get("format") or file_format)
+            for spec in specs]
+
+
+def job_key(job):
+    """Stable identifier of a job's parameters
+    
+    The name is ignored unless the job writes a mesh, whose file it names.
+    """
+    params = job._replace(name=job.name if job.stl else "")._asdict()
+    # Fields at their defaults are left out so older results files still resume
+    if params["offset"] == 0:
+        del params["offset"]
+    if params["format"] == "stl":
+        del params["format"]
+    text = json.dumps(params, sort_keys=True, default=list)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def completed_keys(path):
+    """Keys of the jobs already completed successfully in a results file
+    
+    Jobs recorded with an error are left out so a resumed sweep retries them.
+    A partially written last line (from an interrupted run) is ignored and
+    truncated away so appended results start on a fresh line.
+    """
+    keys = set()
+    if not os.path.exists(path):
+        return keys
+    valid_size = 0
+    with open(path, "rb") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+                key = record["key"]
+            except (ValueError, KeyError):
+                break
+            if record.get("status", "ok") == "ok":
+                keys.add(key)
+            valid_size += len(line)
+    if valid_size != os.path.getsize(path):
+        with open(path, "r+b") as fh:
+            fh.truncate(valid_size)
+    return keys
+
+
+def _run_chunk(chunk, output_dir):
+    """Worker entry point; each process keeps its own compiled-expression cache"""
+    records = []
+    for key, job in chunk:
+        try:
+            record = run_job(job, output_dir)
+            record["status"] = "ok"
+        except Exception as e:
+            record = {"name": job.name, "status": f"error: {e}"}
+        record["key"] = key
+        record["job"] = job._asdict()
+        records.append(record)
+    return records
+
+
+def run_sweep(specs, output_path, workers=None, chunk_size=None, output_dir=".",
+              progress=None):
+    """Run job specs in a process pool, appending results to output_path as they finish
+    
+    Returns (completed, skipped): jobs run now and jobs already present in the
+    output file.
+    """
+    jobs = []
+    for index, spec in enumerate(specs):
+        job = job_from_spec(spec, index)
+        jobs.append((job_key(job), job))
+    done = completed_keys(output_path)
+    pending = [(key, job) for key, job in jobs if key not in done]
+    skipped = len(jobs) - len(pending)
+    
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, len(pending) // (workers * CHUNKS_PER_WORKER) or 1))
+    chunks = iter([pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)])
+    
+    completed = 0
+    with open(output_path, "a") as out, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = set()
+        while True:
+            for chunk in itertools.islice(chunks, workers * CHUNKS_PER_WORKER - len(in_flight)):
+                in_flight.add(pool.submit(_run_chunk, chunk, output_dir))
+            if not in_flight:
+                break
+            finished, in_flight = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                for record in future.result():
+                    out.write(json.dumps(record) + "\n")
+                    completed += 1
+                out.flush()
+            if progress:
+                progress(completed, len(pending))
+    return completed, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a volume parameter sweep across a process pool")
+    parser.add_argument("sweep", help="sweep spec (JSON with base/grid) or a JSON/CSV jobs file")
+    parser.add_argument("output", help="JSON-lines results file (appended to and resumed)")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="jobs per worker task")
+    parser.add_argument("--output-dir", "-d", default=".", help="directory for mesh files")
+    parser.add_argument("--export", choices=MESH_FORMATS,
+                        help="also write every job's mesh in this format")
+    args = parser.parse_args(argv)
+    
+    specs = load_sweep_specs(args.sweep)
+    if args.export:
+        specs = export_specs(specs, args.export)
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    def progress(done, total):
+        print(f"\r{done}/{total} jobs", end="", file=sys.stderr, flush=True)
+    
+    completed, skipped = run_sweep(specs, args.output, args.workers, args.chunk_size,
+                                   args.output_dir, progress)
+    print(f"\nCompleted {completed} jobs ({skipped} already in {args.output})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+"""
+Volume of Revolution Calculator - result cache
+
+Volumes, sampled curves and meshes are stored under a content hash of the
+normalized expressions and every parameter that affects them. Recent entries
+are kept in memory; all entries are also written to a directory of .npz
+files, so a known configuration is reused across restarts. Both tiers evict
+least recently used entries once they exceed their size limits; an entry
+larger than a tier's limit is not stored in that tier.
+
+ResultCache.compute_volume, ResultCache.write_revolution_stl and
+ResultCache.write_revolution_mesh take the same arguments as the volume_engine functions of the same name. Volumes split
+at curve crossings also store each piece, so a changed limit only integrates
+the pieces that actually changed.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import volume_engine
+from volume_metrics import count
+from volume_engine import (IndexedMesh, IntegrationResult, MESH_TOLERANCE,
+                           STREAM_EXPORT_MIN_TRIANGLES, evaluate_on_grid, mesh_format,
+                           normalize_expression, revolution_triangle_count)
+
+# Bump when the meaning of a stored entry changes so old files are ignored
+CACHE_VERSION = 4
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VOLUME_CALCULATOR_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "volume-calculator"))
+MEMORY_LIMIT_BYTES = 64 * 2**20
+DISK_LIMIT_BYTES = 512 * 2**20
+
+
+def cache_key(kind, funcs, **params):
+    """Content hash of an entry kind, the normalized expressions and its parameters"""
+    content = {
+        "version": CACHE_VERSION,
+        "kind": kind,
+        "functions": [normalize_expression(func.source) for func in funcs],
+        "params": {name: float(value) if isinstance(value, (int, float)) else value
+                   for name, value in params.items()},
+    }
+    text = json.dumps(content, sort_keys=True)
+    return f"{kind}-{hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _integration_detail(integrator, dx, tolerance):
+    """The one of dx and tolerance that the integrator actually uses, as key parameters"""
+    if integrator == "riemann":
+        return {"dx": dx}
+    return {"tolerance": tolerance}
+
+
+class ResultCache:
+    """Two-tier (memory LRU, then on-disk .npz) cache of computed arrays
+
+    Entries are dicts of NumPy arrays. Returned arrays are read-only and may
+    be shared between callers. Disk problems never fail a computation; the
+    cache then simply works from memory. Safe to use from several threads
+    and, for the disk tier, several processes.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, memory_limit=MEMORY_LIMIT_BYTES,
+                 disk_limit=DISK_LIMIT_BYTES):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self.entries = OrderedDict()
+        self.memory_bytes = 0
+        # Disk files by path (least recently used first) and their total size,
+        # read from the directory on first use and kept up to date afterwards
+        self.disk_files = None
+        self.disk_bytes = 0
+        self.lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _remember(self, key, arrays):
+        size = sum(array.nbytes for array in arrays.values())
+        with self.lock:
+            if key in self.entries:
+                self.memory_bytes -= sum(array.nbytes for array in self.entries.pop(key).values())
+            # An entry that could never fit is not kept, rather than evicting everything else
+            if size > self.memory_limit:
+                return
+            self.entries[key] = arrays
+            self.memory_bytes += size
+            while self.memory_bytes > self.memory_limit:
+                _, evicted = self.entries.popitem(last=False)
+                self.memory_bytes -= sum(array.nbytes for array in evicted.values())
+
+    def get(self, key):
+        """The arrays stored under key, or None"""
+        with self.lock:
+            arrays = self.entries.get(key)
+            if arrays is not None:
+                self.entries.move_to_end(key)
+        if arrays is not None:
+            count("cache hits")
+            return arrays
+
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            # The modification time orders the disk tier for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        with self.lock:
+            if self.disk_files is not None and path in self.disk_files:
+                self.disk_files.move_to_end(path)
+        for array in arrays.values():
+            array.flags.writeable = False
+        self._remember(key, arrays)
+        count("cache hits")
+        return arrays
+
+    def put(self, key, **arrays):
+        """Store arrays under key in both tiers"""
+        arrays = {name: np.asarray(array) for name, array in arrays.items()}
+        for array in arrays.values():
+            array.flags.writeable = False
+        self._remember(key, arrays)
+
+        # .npz files are uncompressed, so the arrays' size is a lower bound on the file's
+        if self.directory is None or sum(array.nbytes for array in arrays.values()) > self.disk_limit:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so readers never see a partial entry
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    np.savez(fh, **arrays)
+                size = os.path.getsize(temp_path)
+                if size > self.disk_limit:
+                    os.remove(temp_path)
+                    return
+                os.replace(temp_path, path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+            self._add_disk_file(path, size)
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        """Index the directory's files, least recently used first"""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        self.disk_files = OrderedDict((path, size) for _, path, size in sorted(files))
+        self.disk_bytes = sum(self.disk_files.values())
+
+    def _add_disk_file(self, path, size):
+        """Record a written file and remove least recently used files until the tier fits disk_limit
+
+        Files written by other processes are picked up the next time a cache
+        object scans the directory.
+        """
+        with self.lock:
+            if self.disk_files is None:
+                self._scan_disk()
+            self.disk_bytes += size - self.disk_files.pop(path, 0)
+            self.disk_files[path] = size
+            while self.disk_bytes > self.disk_limit:
+                evicted, evicted_size = self.disk_files.popitem(last=False)
+                self.disk_bytes -= evicted_size
+                try:
+                    os.remove(evicted)
+                except OSError:
+                    pass
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self.lock:
+            self.entries.clear()
+            self.memory_bytes = 0
+            self.disk_files = None
+            self.disk_bytes = 0
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def _load_result(self, key):
+        arrays = self.get(key)
+        if arrays is None:
+            return None
+        return IntegrationResult(float(arrays["volume"]), float(arrays["error"]),
+                                 int(arrays["evaluations"]), str(arrays["integrator"]),
+                                 tuple(float(x) for x in arrays["crossings"]))
+
+    def _store_result(self, key, result):
+        # Symbolic fallbacks can depend on timing (e.g. a timeout), so they are not stored
+        if "fallback" not in result.integrator:
+            self.put(key, volume=result.volume, error=result.error,
+                     evaluations=result.evaluations, integrator=result.integrator,
+                     crossings=np.array(result.crossings, dtype=float))
+
+    def compute_volume(self, funcs, revolve_index, a, b, dx, axis, method,
+                       integrator="riemann", tolerance=1e-9, progress=None, offset=0.0):
+        """volume_engine.compute_volume, reusing stored results and pieces when possible"""
+        key = cache_key("volume", funcs, revolve_index=revolve_index, a=a, b=b, axis=axis,
+                        method=method, integrator=integrator, offset=offset,
+                        **_integration_detail(integrator, dx, tolerance))
+        result = self._load_result(key)
+        if result is None:
+            result = volume_engine.compute_volume(funcs, revolve_index, a, b, dx, axis, method,
+                                                  integrator, tolerance, progress, offset,
+                                                  piece_volume=self.integrate_piece)
+            self._store_result(key, result)
+        return result
+
+    def integrate_piece(self, funcs, revolve_index, a, b, dx, axis, method,
+                        integrator="riemann", tolerance=1e-9, progress=None, offset=0.0):
+        """volume_engine.integrate_piece, reusing a stored piece when possible"""
+        key = cache_key("piece", funcs, revolve_index=revolve_index, a=a, b=b, axis=axis,
+                        method=method, integrator=integrator, offset=offset,
+                        **_integration_detail(integrator, dx, tolerance))
+        result = self._load_result(key)
+        if result is None:
+            result = volume_engine.integrate_piece(funcs, revolve_index, a, b, dx, axis, method,
+                                                   integrator, tolerance, progress, offset)
+            self._store_result(key, result)
+        return result
+
+    def sample_curves(self, funcs, a, b, points):
+        """Each function sampled at points values spanning [a, b], as (x, samples)"""
+        key = cache_key("curves", funcs, a=a, b=b, points=points)
+        arrays = self.get(key)
+        if arrays is None:
+            x_vals = np.linspace(a, b, points)
+            samples = np.stack([evaluate_on_grid(func, x_vals) for func in funcs])
+            self.put(key, x=x_vals, samples=samples)
+            return x_vals, samples
+        return arrays["x"], arrays["samples"]
+
+    def revolution_mesh(self, funcs, revolve_index, a, b, axis, method, mesh_mode="adaptive",
+                        resolution=50, mesh_tolerance=MESH_TOLERANCE, progress=None, offset=0.0):
+        """volume_engine.revolution_mesh, reusing a stored mesh when possible"""
+        # Only the setting that controls the chosen mesh mode is part of the key
+        if mesh_mode == "adaptive":
+            detail = {"mesh_tolerance": mesh_tolerance}
+        else:
+            detail = {"resolution": resolution}
+        key = cache_key("mesh", funcs, revolve_index=revolve_index, a=a, b=b, axis=axis,
+                        method=method, mesh=mesh_mode, offset=offset, **detail)
+        arrays = self.get(key)
+        if arrays is not None:
+            return IndexedMesh(arrays["vertices"], arrays["faces"])
+
+        indexed_mesh = volume_engine.revolution_mesh(funcs, revolve_index, a, b, axis, method,
+                                                     mesh_mode, resolution, mesh_tolerance,
+                                                     progress, offset)
+        self.put(key, vertices=indexed_mesh.vertices, faces=indexed_mesh.faces)
+        return indexed_mesh
+
+    def write_revolution_stl(self, filename, funcs, revolve_index, a, b, axis, method,
+                             mesh_mode="adaptive", resolution=50,
+                             mesh_tolerance=MESH_TOLERANCE, progress=None, offset=0.0):
+        """volume_engine.write_revolution_stl, reusing a stored mesh when possible"""
+        return self.write_revolution_mesh(filename, funcs, revolve_index, a, b, axis, method,
+                                          mesh_mode, resolution, mesh_tolerance, progress,
+                                          offset, "stl")
+
+    def write_revolution_mesh(self, filename, funcs, revolve_index, a, b, axis, method,
+                              mesh_mode="adaptive", resolution=50,
+                              mesh_tolerance=MESH_TOLERANCE, progress=None, offset=0.0,
+                              file_format=None):
+        """volume_engine.write_revolution_mesh, reusing a stored mesh when possible
+
+        Uniform meshes large enough to be streamed to STL are not cached, in
+        any format.
+        """
+        file_format = file_format or mesh_format(filename, "stl")
+        streamed = revolution_triangle_count(resolution) >= STREAM_EXPORT_MIN_TRIANGLES
+        if mesh_mode == "uniform" and streamed:
+            return volume_engine.write_revolution_mesh(filename, funcs, revolve_index, a, b, axis,
+                                                       method, mesh_mode, resolution,
+                                                       mesh_tolerance, progress, offset,
+                                                       file_format)
+        indexed_mesh = self.revolution_mesh(funcs, revolve_index, a, b, axis, method, mesh_mode,
+                                            resolution, mesh_tolerance, progress, offset)
+        return volume_engine.write_indexed_mesh(filename, indexed_mesh, progress, file_format)
@@ -2,62 +2,195 @@
 """
 Volume of Revolution Calculator
 Debug version for py2app
-"""
 
-print("=== Starting Volume Calculator ===")
+Set VOLUME_CALCULATOR_DEBUG=1 to print import diagnostics at startup, or run
+with --startup-report[=FILE] to time the imports and startup phases. SymPy,
+matplotlib and numpy-stl are only loaded once a computation, plot or export
+needs them, so the window appears without waiting for them.
+"""
 
 import sys
 import os
-print(f"Python version: {sys.version}")
-print(f"Current directory: {os.getcwd()}")
 
-# Set matplotlib backend first
-try:
-    import matplotlib
-    matplotlib.use('TkAgg')
-    print("✅ Matplotlib backend set to TkAgg")
-except Exception as e:
-    print(f"❌ Matplotlib error: {e}")
+# Installed before any other import so the report covers them all
+STARTUP_REPORT = next((arg for arg in sys.argv[1:]
+                       if arg.partition("=")[0] == "--startup-report"), None)
+if STARTUP_REPORT is not None:
+    from volume_startup import StartupTimer
+    startup_timer = StartupTimer()
+    startup_timer.install()
+else:
+    startup_timer = None
+
+DEBUG = bool(os.environ.get("VOLUME_CALCULATOR_DEBUG"))
+
+
+def debug(message):
+    """Print startup diagnostics when VOLUME_CALCULATOR_DEBUG is set"""
+    if DEBUG:
+        print(message)
+
+
+debug("=== Starting Volume Calculator ===")
+
+import time
+import queue
+import threading
+import importlib.util
+debug(f"Python version: {sys.version}")
+debug(f"Current directory: {os.getcwd()}")
 
 try:
-    import numpy as np
-    print("✅ NumPy imported")
-    
-    import matplotlib.pyplot as plt
-    print("✅ Matplotlib pyplot imported")
-    
-    from mpl_toolkits.mplot3d import Axes3D
-    print("✅ 3D plotting imported")
-    
-    import sympy as sp
-    print("✅ SymPy imported")
-    
     import tkinter as tk
     from tkinter import ttk, messagebox, simpledialog, filedialog
-    print("✅ Tkinter imported")
+    debug("✅ Tkinter imported")
+    
+    from volume_engine import (STL_AVAILABLE, INTEGRATORS, MESH_FORMATS, MESH_MODES,
+                               MESH_TOLERANCE, JobCancelled)
+    import volume_engine
+    from volume_cache import ResultCache
+    from volume_metrics import Recorder, recording, profiled
+    debug("✅ Volume engine imported")
     
     # Optional STL support
-    try:
-        from stl import mesh
-        STL_AVAILABLE = True
-        print("✅ STL support enabled")
-    except ImportError:
-        STL_AVAILABLE = False
-        print("⚠️ STL support disabled")
+    if STL_AVAILABLE:
+        debug("✅ STL support enabled")
+    else:
+        debug("⚠️ STL support disabled")
         
-    print("🎉 All imports successful!")
+    debug("🎉 All imports successful!")
     
 except ImportError as e:
     print(f"❌ Critical import error: {e}")
     sys.exit(1)
 
+def load_plotting():
+    """Import matplotlib and mplot3d via volume_plot
+    
+    Workers call this before their result is plotted, so the first plot does
+    not stall the main thread on the import.
+    """
+    import volume_plot
+
+
+class BackgroundTask:
+    """Run a computation on a worker thread and relay it back to the Tk loop
+    
+    target is called as target(progress) on the worker thread. Progress, the
+    result and any error are queued and picked up by polling with root.after,
+    so the callbacks always run on the main thread. Once cancel() is called
+    the next progress report raises JobCancelled inside the computation.
+    
+    When on_partial is given, target is called as target(progress, publish)
+    and every publish(value) is handed to on_partial before the final result,
+    which lets a computation show a coarse answer while it keeps refining.
+    """
+    
+    POLL_MS = 16
+    
+    def __init__(self, root, target, on_done, on_error, on_cancelled, on_progress,
+                 on_partial=None):
+        self.root = root
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.on_progress = on_progress
+        self.on_partial = on_partial
+        self.cancel_event = threading.Event()
+        self.events = queue.Queue()
+        threading.Thread(target=self._run, args=(target,), daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll)
+    
+    def progress(self, fraction, message):
+        """Progress callback handed to the computation"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.events.put(("progress", (fraction, message)))
+    
+    def publish(self, value):
+        """Hand an intermediate result to on_partial"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+        self.events.put(("partial", value))
+    
+    def cancel(self):
+        self.cancel_event.set()
+    
+    def _run(self, target):
+        try:
+            if self.on_partial is not None:
+                result = target(self.progress, self.publish)
+            else:
+                result = target(self.progress)
+            self.events.put(("done", result))
+        except JobCancelled:
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self.events.put(("error", e))
+    
+    def _poll(self):
+        latest = None
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                latest = value
+                continue
+            if kind == "partial":
+                if self.cancel_event.is_set():
+                    continue
+                try:
+                    self.on_partial(value)
+                except Exception as e:
+                    self.cancel()
+                    self.on_error(e)
+                    return
+                continue
+            try:
+                if kind == "done":
+                    self.on_done(value)
+                elif kind == "error":
+                    self.on_error(value)
+                else:
+                    self.on_cancelled()
+            except Exception as e:
+                self.on_error(e)
+            return
+        if latest is not None and not self.cancel_event.is_set():
+            self.on_progress(*latest)
+        self.root.after(self.POLL_MS, self._poll)
+
+
 class VolumeCalculator:
+    # Live preview: wait this long after the last edit, then show a coarse
+    # result before refining it with the selected integrator
+    PREVIEW_DELAY_MS = 300
+    PREVIEW_SAMPLES = 200
+    PREVIEW_PLOT_POINTS = 20
+    
+    # Print queue: mesh worker processes, and how often its status is checked
+    PRINT_WORKERS = 2
+    PRINT_POLL_MS = 200
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Volume of Revolution Calculator")
-        self.root.geometry("900x700")
+        self.root.geometry("1500x800")
         self.cross_section_var = tk.BooleanVar(value=False)
+        self.live_preview_var = tk.BooleanVar(value=True)
+        self.task = None
+        self.task_is_preview = False
+        self.preview_after = None
+        self.metrics = None
+        self.profile_var = tk.BooleanVar(value=False)
+        self.plot_panel = None
+        self.cache = ResultCache()
+        self.print_queue = None
+        self.print_poll_after = None
         self.setup_ui()
+        self.setup_live_preview()
         
     def setup_ui(self):
         # Main frame
@@ -95,6 +228,10 @@ class VolumeCalculator:
         ttk.Combobox(main_frame, textvariable=self.axis_var, 
                     values=["x", "y"], state="readonly", width=10).grid(row=6, column=1, sticky=tk.W)
         
+        ttk.Label(main_frame, text="Axis offset (y=k / x=h):").grid(row=6, column=2, sticky=tk.W, padx=5)
+        self.offset_var = tk.StringVar(value="0")
+        ttk.Entry(main_frame, textvariable=self.offset_var, width=10).grid(row=6, column=3, sticky=tk.W)
+        
         ttk.Label(main_frame, text="Revolve Function:").grid(row=7, column=0, sticky=tk.W)
         self.func_var = tk.StringVar(value="f₁(x)")
         ttk.Combobox(main_frame, textvariable=self.func_var, 
@@ -108,6 +245,8 @@ class VolumeCalculator:
         # Cross-section option
         ttk.Checkbutton(main_frame, text="Show Cross-Sections", 
                        variable=self.cross_section_var).grid(row=9, column=0, columnspan=2, sticky=tk.W, pady=5)
+        ttk.Checkbutton(main_frame, text="Live preview", 
+                       variable=self.live_preview_var).grid(row=9, column=2, columnspan=2, sticky=tk.W, pady=5)
         
         # Limits
         ttk.Label(main_frame, text="Integration Limits:", 
@@ -125,83 +264,252 @@ class VolumeCalculator:
         self.dx_var = tk.StringVar(value="0.01")
         ttk.Entry(main_frame, textvariable=self.dx_var, width=10).grid(row=13, column=1, sticky=tk.W)
         
+        ttk.Label(main_frame, text="Integrator:").grid(row=14, column=0, sticky=tk.W)
+        self.integrator_var = tk.StringVar(value="riemann")
+        ttk.Combobox(main_frame, textvariable=self.integrator_var, 
+                    values=INTEGRATORS, state="readonly", width=14).grid(row=14, column=1, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="Tolerance:").grid(row=15, column=0, sticky=tk.W)
+        self.tolerance_var = tk.StringVar(value="1e-9")
+        ttk.Entry(main_frame, textvariable=self.tolerance_var, width=10).grid(row=15, column=1, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="Mesh resolution:").grid(row=16, column=0, sticky=tk.W)
+        self.resolution_var = tk.StringVar(value="50")
+        ttk.Entry(main_frame, textvariable=self.resolution_var, width=10).grid(row=16, column=1, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="Mesh format:").grid(row=16, column=2, sticky=tk.W, padx=5)
+        self.export_format_var = tk.StringVar(value="stl")
+        ttk.Combobox(main_frame, textvariable=self.export_format_var, 
+                    values=MESH_FORMATS, state="readonly", width=6).grid(row=16, column=3, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="Mesh:").grid(row=17, column=0, sticky=tk.W)
+        self.mesh_mode_var = tk.StringVar(value="adaptive")
+        ttk.Combobox(main_frame, textvariable=self.mesh_mode_var, 
+                    values=MESH_MODES, state="readonly", width=10).grid(row=17, column=1, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="Mesh tolerance:").grid(row=18, column=0, sticky=tk.W)
+        self.mesh_tolerance_var = tk.StringVar(value=str(MESH_TOLERANCE))
+        ttk.Entry(main_frame, textvariable=self.mesh_tolerance_var, width=10).grid(row=18, column=1, sticky=tk.W)
+        
+        # OctoPrint-compatible printer used by "Send to 3D Printer"
+        ttk.Label(main_frame, text="Printer URL:").grid(row=17, column=2, sticky=tk.W, padx=5)
+        self.printer_url_var = tk.StringVar(value=os.environ.get("OCTOPRINT_URL", ""))
+        ttk.Entry(main_frame, textvariable=self.printer_url_var, width=24).grid(row=17, column=3, sticky=tk.W)
+        
+        ttk.Label(main_frame, text="API key:").grid(row=18, column=2, sticky=tk.W, padx=5)
+        self.printer_key_var = tk.StringVar(value=os.environ.get("OCTOPRINT_API_KEY", ""))
+        ttk.Entry(main_frame, textvariable=self.printer_key_var, width=24, show="*").grid(row=18, column=3, sticky=tk.W)
+        
         # Buttons frame
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=14, column=0, columnspan=4, pady=20)
+        button_frame.grid(row=19, column=0, columnspan=4, pady=20)
         
         ttk.Button(button_frame, text="Generate Visualization", 
                   command=self.calculate_and_plot).grid(row=0, column=0, padx=5)
         
-        ttk.Button(button_frame, text="Export to STL", 
+        ttk.Button(button_frame, text="Export Mesh", 
                   command=self.export_to_stl).grid(row=0, column=1, padx=5)
         
+        ttk.Button(button_frame, text="Batch Export", 
+                  command=self.batch_export).grid(row=0, column=2, padx=5)
+        
         ttk.Button(button_frame, text="Send to 3D Printer", 
-                  command=self.send_to_printer).grid(row=0, column=2, padx=5)
+                  command=self.send_to_printer).grid(row=0, column=3, padx=5)
+        
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", 
+                                        command=self.cancel_task, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=4, padx=5)
+        
+        # Dump a cProfile of each background computation (for attaching to tickets)
+        ttk.Checkbutton(button_frame, text="Profile", 
+                       variable=self.profile_var).grid(row=0, column=5, padx=5)
         
         # Results text area
         ttk.Label(main_frame, text="Results:", 
-                 font=("Arial", 10, "bold")).grid(row=15, column=0, sticky=tk.W, pady=5)
+                 font=("Arial", 10, "bold")).grid(row=20, column=0, sticky=tk.W, pady=5)
         
         self.results_text = tk.Text(main_frame, height=10, width=80)
-        self.results_text.grid(row=16, column=0, columnspan=4, sticky=(tk.W, tk.E))
+        self.results_text.grid(row=21, column=0, columnspan=4, sticky=(tk.W, tk.E))
         
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN)
-        status_bar.grid(row=17, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=5)
+        status_bar.grid(row=22, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=5)
         
         # Configure grid weights
         main_frame.columnconfigure(0, weight=1)
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
+        
+        # Plots are embedded next to the controls and reused for every render
+        self.plot_frame = ttk.Frame(self.root, padding="10")
+        self.plot_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.root.columnconfigure(1, weight=3)
+    
+    def setup_live_preview(self):
+        """Recompute in the background whenever an input changes"""
+        for entry in (self.func1, self.func2, self.func3):
+            for event in ("<KeyRelease>", "<<Paste>>", "<<Cut>>"):
+                entry.bind(event, self.schedule_preview, add="+")
+        
+        for var in (self.a_var, self.b_var, self.dx_var, self.axis_var, self.offset_var, self.func_var,
+                    self.method_var, self.integrator_var, self.tolerance_var,
+                    self.cross_section_var, self.live_preview_var):
+            var.trace_add("write", self.schedule_preview)
+        
+        self.schedule_preview()
+    
+    def schedule_preview(self, *args):
+        """Debounce edits: restart the preview timer on every change"""
+        if self.preview_after is not None:
+            self.root.after_cancel(self.preview_after)
+            self.preview_after = None
+        if self.live_preview_var.get():
+            self.preview_after = self.root.after(self.PREVIEW_DELAY_MS, self.live_preview)
+    
+    def live_preview(self):
+        """Show a coarse volume and plot at once, then refine in the background"""
+        self.preview_after = None
+        
+        # Never interrupt an export; try again once it has finished
+        if self.task is not None and not self.task_is_preview:
+            self.schedule_preview()
+            return
+        
+        # Half-typed input is expected here, so problems only go to the status bar
+        try:
+            a = float(self.a_var.get())
+            b = float(self.b_var.get())
+            dx = float(self.dx_var.get())
+            tolerance = float(self.tolerance_var.get())
+            offset = float(self.offset_var.get())
+            if a == b:
+                raise ValueError("the limits are equal")
+        except ValueError as e:
+            self.status_var.set(f"Preview paused: {e}")
+            return
+        
+        func_strs = [self.func1.get(), self.func2.get(), self.func3.get()]
+        revolve_index = {"f₁(x)": 0, "f₂(x)": 1, "f₃(x)": 2}[self.func_var.get()]
+        axis = self.axis_var.get()
+        method = self.method_var.get()
+        integrator = self.integrator_var.get()
+        cross_sections = self.cross_section_var.get()
+        coarse_dx = (b - a) / self.PREVIEW_SAMPLES
+        
+        # Parsing (which loads SymPy the first time) happens on the worker too
+        def work(progress, publish):
+            funcs = volume_engine.parse_functions(func_strs)
+            if not funcs:
+                raise ValueError("enter a function")
+            if revolve_index >= len(funcs):
+                raise ValueError("selected function is not defined")
+            load_plotting()
+            from volume_plot import CURVE_POINTS
+            curves = self.cache.sample_curves(funcs, a, b, CURVE_POINTS)
+            coarse = self.cache.compute_volume(funcs, revolve_index, a, b, coarse_dx, axis, method,
+                                               offset=offset)
+            publish((funcs, curves,
+                     coarse._replace(integrator=f"{coarse.integrator} (coarse preview)")))
+            return funcs, curves, self.cache.compute_volume(funcs, revolve_index, a, b, dx, axis,
+                                                            method, integrator, tolerance,
+                                                            progress, offset)
+        
+        def coarse(value):
+            funcs, curves, result = value
+            self.create_plots(funcs, revolve_index, a, b, axis, method, offset, cross_sections,
+                              result.volume, curves, points=self.PREVIEW_PLOT_POINTS)
+            self.display_results(funcs, revolve_index, a, b, coarse_dx, axis, method, offset,
+                                 cross_sections, result, self.metrics)
+            self.status_var.set("Refining volume...")
+        
+        def done(value):
+            funcs, curves, result = value
+            self.create_plots(funcs, revolve_index, a, b, axis, method, offset, cross_sections,
+                              result.volume, curves)
+            self.display_results(funcs, revolve_index, a, b, dx, axis, method, offset,
+                                 cross_sections, result, self.metrics)
+            self.status_var.set("Preview up to date")
+        
+        def failed(error):
+            if isinstance(error, ValueError):
+                self.status_var.set(f"Preview paused: {str(error).splitlines()[0]}")
+            else:
+                self.status_var.set(f"Preview error: {error}")
+        
+        self.start_task("Updating preview", work, done, on_partial=coarse, on_error=failed,
+                        preview=True)
     
     def parse_functions(self):
         """Parse the function strings into callable functions"""
-        funcs = []
         func_strs = [self.func1.get(), self.func2.get(), self.func3.get()]
-        
-        for func_str in func_strs:
-            if func_str.strip():
-                try:
-                    func = eval(f"lambda x: {func_str}")
-                    # Test the function
-                    test_val = func(1.0)
-                    funcs.append(func)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Invalid function: {func_str}\nError: {e}")
-                    return None
+        try:
+            funcs = volume_engine.parse_functions(func_strs)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return None
         return funcs if funcs else None
     
-    def calculate_volume(self, funcs, revolve_index, a, b, dx):
-        """Calculate volume using numerical integration"""
-        volume = 0
-        x_vals = np.arange(a, b, dx)
-        
-        if self.axis_var.get() == 'x':
-            # Revolution around x-axis
-            for x in x_vals:
-                if self.method_var.get() == 'disk':
-                    radius = funcs[revolve_index](x)
-                    volume += np.pi * (radius ** 2) * dx
-                else:  # washer method
-                    outer_radius = funcs[revolve_index](x)
-                    inner_radius_sq = 0
-                    for i, func in enumerate(funcs):
-                        if i != revolve_index:
-                            inner_radius_sq += (func(x) ** 2)
-                    volume += np.pi * ((outer_radius ** 2) - inner_radius_sq) * dx
-        else:
-            # Revolution around y-axis (shell method)
-            for x in x_vals:
-                radius = x
-                height = funcs[revolve_index](x)
-                if self.method_var.get() == 'washer' and len(funcs) > 1:
-                    for i, func in enumerate(funcs):
-                        if i != revolve_index:
-                            height -= func(x)
-                volume += 2 * np.pi * radius * abs(height) * dx
-                
-        return volume
+    def start_task(self, description, target, on_done, on_partial=None, on_error=None,
+                   preview=False):
+        """Run target(progress) in the background, replacing any running task
+        
+        Spans and counters from the worker and from the callbacks are recorded
+        in a fresh Recorder, available to the callbacks as self.metrics.
+        """
+        if self.task is not None:
+            self.task.cancel()
+        if on_error is None:
+            on_error = self.task_failed
+        
+        metrics = Recorder()
+        run = profiled(target, "volume") if self.profile_var.get() else target
+        
+        def work(*args):
+            with recording(metrics):
+                return run(*args)
+        
+        def finish(callback):
+            def handler(*args):
+                # Results of a task that has since been replaced are dropped
+                if self.task is task:
+                    self.task = None
+                    self.cancel_button.config(state=tk.DISABLED)
+                    self.metrics = metrics
+                    with recording(metrics):
+                        callback(*args)
+                    if run is not target and run.last_profile:
+                        self.status_var.set(f"{self.status_var.get()} (profile: {run.last_profile})")
+            return handler
+        
+        def progress(fraction, message):
+            if self.task is task:
+                percent = f" {fraction:.0%}" if fraction is not None else ""
+                self.status_var.set(f"{message}...{percent}")
+        
+        def partial(value):
+            if self.task is task:
+                self.metrics = metrics
+                with recording(metrics):
+                    on_partial(value)
+        
+        task = BackgroundTask(self.root, work, finish(on_done), finish(on_error),
+                              finish(lambda: self.status_var.set("Cancelled")), progress,
+                              partial if on_partial is not None else None)
+        self.task = task
+        self.task_is_preview = preview
+        self.cancel_button.config(state=tk.NORMAL)
+        self.status_var.set(f"{description}...")
+    
+    def cancel_task(self):
+        """Ask the running computation to stop"""
+        if self.task is not None:
+            self.task.cancel()
+            self.status_var.set("Cancelling...")
+    
+    def task_failed(self, error):
+        messagebox.showerror("Error", f"Calculation error: {error}")
+        self.status_var.set(f"Error: {error}")
     
     def calculate_and_plot(self):
         """Main calculation and plotting function"""
@@ -220,169 +528,66 @@ class VolumeCalculator:
                 messagebox.showerror("Error", "Selected function is not defined")
                 return
             
-            # Calculate volume
-            volume = self.calculate_volume(funcs, revolve_index, a, b, dx)
+            # Tk variables are read here; the worker thread only sees plain values
+            axis = self.axis_var.get()
+            method = self.method_var.get()
+            integrator = self.integrator_var.get()
+            tolerance = float(self.tolerance_var.get())
+            offset = float(self.offset_var.get())
+            cross_sections = self.cross_section_var.get()
             
-            # Create visualization
-            self.create_plots(funcs, revolve_index, a, b, volume)
+            # Calculate volume in the background
+            # Curves for the plot are sampled here too, so the main thread only draws
+            def work(progress):
+                load_plotting()
+                from volume_plot import CURVE_POINTS
+                curves = self.cache.sample_curves(funcs, a, b, CURVE_POINTS)
+                return curves, self.cache.compute_volume(funcs, revolve_index, a, b, dx, axis,
+                                                         method, integrator, tolerance, progress,
+                                                         offset)
             
-            # Display results
-            self.display_results(funcs, revolve_index, a, b, dx, volume)
+            def done(value):
+                curves, result = value
+                # Create visualization
+                self.create_plots(funcs, revolve_index, a, b, axis, method, offset,
+                                  cross_sections, result.volume, curves)
+                
+                # Display results
+                self.display_results(funcs, revolve_index, a, b, dx, axis, method, offset,
+                                     cross_sections, result, self.metrics)
+                
+                self.status_var.set("Visualization generated successfully")
             
-            self.status_var.set("Visualization generated successfully")
+            self.start_task("Calculating volume", work, done)
             
         except Exception as e:
             messagebox.showerror("Error", f"Calculation error: {e}")
             self.status_var.set(f"Error: {e}")
     
-    def create_plots(self, funcs, revolve_index, a, b, volume):
-        """Create 2D and 3D plots with optional cross-sections"""
-        fig = plt.figure(figsize=(15, 6))
-        
-        # 3D Plot
-        ax1 = fig.add_subplot(121, projection='3d')
-        
-        x = np.linspace(a, b, 50)
-        theta = np.linspace(0, 2*np.pi, 50)
-        X, T = np.meshgrid(x, theta)
-        
-        if self.axis_var.get() == 'x':
-            revolve_func = funcs[revolve_index]
-            R_outer = revolve_func(X)
-            Y_outer = R_outer * np.cos(T)
-            Z_outer = R_outer * np.sin(T)
-            
-            ax1.plot_surface(X, Y_outer, Z_outer, alpha=0.7, color='blue')
-            
-            if self.method_var.get() == 'washer':
-                for i, func in enumerate(funcs):
-                    if i != revolve_index:
-                        R_inner = func(X)
-                        Y_inner = R_inner * np.cos(T)
-                        Z_inner = R_inner * np.sin(T)
-                        ax1.plot_surface(X, Y_inner, Z_inner, alpha=0.5, color='red')
-            
-            # Add cross-sections if enabled
-            if self.cross_section_var.get():
-                # Add cross-sections at specific theta values
-                for theta_val in [0, np.pi/2, np.pi, 3*np.pi/2]:
-                    x_cross = np.linspace(a, b, 30)
-                    y_cross = revolve_func(x_cross) * np.cos(theta_val)
-                    z_cross = revolve_func(x_cross) * np.sin(theta_val)
-                    ax1.plot(x_cross, y_cross, z_cross, 'k-', linewidth=2, alpha=0.8)
-            
-            ax1.set_title(f'3D Revolution around X-axis\n({self.method_var.get().title()} Method)')
-        else:
-            revolve_func = funcs[revolve_index]
-            for x_val in np.linspace(a, b, 20):
-                radius = revolve_func(x_val)
-                theta_circle = np.linspace(0, 2*np.pi, 30)
-                x_circle = radius * np.cos(theta_circle)
-                z_circle = radius * np.sin(theta_circle)
-                y_circle = np.full_like(x_circle, x_val)
-                ax1.plot(x_circle, y_circle, z_circle, 'b-', alpha=0.6)
-            
-            # Add cross-sections if enabled
-            if self.cross_section_var.get():
-                # Add cross-sections at specific x values
-                for x_val in np.linspace(a, b, 5):
-                    radius = revolve_func(x_val)
-                    theta_circle = np.linspace(0, 2*np.pi, 30)
-                    x_circle = radius * np.cos(theta_circle)
-                    z_circle = radius * np.sin(theta_circle)
-                    y_circle = np.full_like(x_circle, x_val)
-                    ax1.plot(x_circle, y_circle, z_circle, 'k-', linewidth=2, alpha=0.8)
-            
-            ax1.set_title(f'3D Revolution around Y-axis\n(Shell Method)')
-        
-        ax1.set_xlabel('X')
-        ax1.set_ylabel('Y')
-        ax1.set_zlabel('Z')
-        
-        # 2D Plot
-        ax2 = fig.add_subplot(122)
-        x_vals = np.linspace(a, b, 200)
-        
-        colors = ['blue', 'red', 'green']
-        labels = ['f₁(x)', 'f₂(x)', 'f₃(x)']
-        
-        for i, func in enumerate(funcs):
-            y_vals = func(x_vals)
-            ax2.plot(x_vals, y_vals, color=colors[i], linewidth=2, label=labels[i])
-            if i == revolve_index:
-                ax2.fill_between(x_vals, y_vals, alpha=0.3, color=colors[i])
-        
-        ax2.set_xlabel('x')
-        ax2.set_ylabel('y')
-        ax2.set_title('2D Area Between Curves')
-        ax2.legend()
-        ax2.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.show()
-    
-    def generate_stl_mesh(self, funcs, revolve_index, a, b, num_points=50):
-        """Generate a 3D mesh for STL export"""
-        if not STL_AVAILABLE:
-            messagebox.showerror("Error", "numpy-stl library not available. Please install it with: pip install numpy-stl")
-            return None
-            
-        try:
-            revolve_func = funcs[revolve_index]
-            
-            # Create vertices for the revolution
-            u = np.linspace(a, b, num_points)  # x values
-            v = np.linspace(0, 2*np.pi, num_points)  # theta values
-            
-            vertices = []
-            
-            if self.axis_var.get() == 'x':
-                # Revolution around x-axis
-                for x_val in u:
-                    radius = revolve_func(x_val)
-                    for theta in v:
-                        y_val = radius * np.cos(theta)
-                        z_val = radius * np.sin(theta)
-                        vertices.append([x_val, y_val, z_val])
-            else:
-                # Revolution around y-axis
-                for y_val in u:
-                    radius = revolve_func(y_val)
-                    for theta in v:
-                        x_val = radius * np.cos(theta)
-                        z_val = radius * np.sin(theta)
-                        vertices.append([x_val, y_val, z_val])
-            
-            vertices = np.array(vertices)
-            
-            # Create faces (simplified triangulation)
-            # This is a simplified approach - for production use, consider a proper triangulation
-            faces = []
-            for i in range(num_points-1):
-                for j in range(num_points-1):
-                    # Create two triangles for each quad
-                    v1 = i * num_points + j
-                    v2 = i * num_points + j + 1
-                    v3 = (i + 1) * num_points + j
-                    v4 = (i + 1) * num_points + j + 1
-                    
-                    faces.append([v1, v2, v3])
-                    faces.append([v2, v4, v3])
-            
-            # Create the mesh
-            stl_mesh = mesh.Mesh(np.zeros(len(faces), dtype=mesh.Mesh.dtype))
-            for i, face in enumerate(faces):
-                for j in range(3):
-                    stl_mesh.vectors[i][j] = vertices[face[j]]
-            
-            return stl_mesh
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"STL generation error: {e}")
-            return None
+    def create_plots(self, funcs, revolve_index, a, b, axis, method, offset, cross_sections,
+                     volume, curves, points=None):
+        """Update the embedded 2D and 3D plots with optional cross-sections
+        
+        Every input is passed in as it was when the computation started, so
+        edits made while it ran do not mix into the plot. curves are the
+        (x, samples) the worker thread sampled for the 2D plot.
+        """
+        from volume_plot import PlotPanel, SURFACE_POINTS
+        if points is None:
+            points = SURFACE_POINTS
+        if self.plot_panel is None:
+            self.plot_panel = PlotPanel(self.plot_frame)
+            self.plot_panel.widget.pack(fill=tk.BOTH, expand=True)
+        self.plot_panel.update(funcs, revolve_index, a, b, axis, method, cross_sections, points,
+                               curves, offset)
     
-    def export_to_stl(self):
-        """Export the 3D model to STL file"""
+    def export_to_stl(self, on_saved=None):
+        """Export the 3D model to an STL, 3MF or PLY file
+        
+        The file's extension picks the format. The mesh is generated and
+        written in the background; on_saved(filename) is called once the file
+        is complete.
+        """
         try:
             # Parse inputs
             funcs = self.parse_functions()
@@ -397,48 +602,178 @@ class VolumeCalculator:
                 messagebox.showerror("Error", "Selected function is not defined")
                 return
             
-            # Generate STL mesh
-            stl_mesh = self.generate_stl_mesh(funcs, revolve_index, a, b)
-            if stl_mesh is None:
-                return
+            mesh_mode = self.mesh_mode_var.get()
+            num_points = int(self.resolution_var.get())
+            mesh_tolerance = float(self.mesh_tolerance_var.get())
+            offset = float(self.offset_var.get())
             
             # Ask for save location
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".stl",
-                filetypes=[("STL files", "*.stl"), ("All files", "*.*")],
-                title="Save STL file as"
-            )
+            filename = self.ask_stl_filename()
             
             if filename:
-                stl_mesh.save(filename)
-                self.status_var.set(f"STL file saved successfully: {filename}")
-                messagebox.showinfo("Success", f"STL file saved successfully:\n{filename}")
+                axis = self.axis_var.get()
+                method = self.method_var.get()
+                
+                # Meshes are reused from the cache when the inputs have not changed;
+                # very large uniform STL meshes are streamed to the file instead
+                def work(progress):
+                    return self.cache.write_revolution_mesh(filename, funcs, revolve_index, a, b,
+                                                            axis, method, mesh_mode, num_points,
+                                                            mesh_tolerance, progress, offset)
+                
+                def done(triangle_count):
+                    self.stl_saved(filename)
+                    if on_saved is not None:
+                        on_saved(filename)
+                
+                self.start_task("Exporting mesh", work, done)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Export error: {e}")
             self.status_var.set(f"Export error: {e}")
     
-    def send_to_printer(self):
-        """Simulate sending to 3D printer (in a real application, this would interface with printer software)"""
+    def ask_stl_filename(self):
+        """Ask where to save the mesh, offering the selected format first"""
+        selected = self.export_format_var.get()
+        formats = [selected] + [fmt for fmt in MESH_FORMATS if fmt != selected]
+        return filedialog.asksaveasfilename(
+            defaultextension=f".{selected}",
+            filetypes=[(f"{fmt.upper()} files", f"*.{fmt}") for fmt in formats]
+                      + [("All files", "*.*")],
+            title="Save mesh file as"
+        )
+    
+    def stl_saved(self, filename):
+        """Report a successful mesh export"""
+        timing = f" ({self.metrics.summary()})" if self.metrics is not None else ""
+        self.status_var.set(f"Mesh file saved successfully: {filename}{timing}")
+        messagebox.showinfo("Success", f"Mesh file saved successfully:\n{filename}")
+    
+    def batch_export(self):
+        """Mesh every job of a jobs or sweep file across a process pool
+        
+        Jobs that don't name their own file are written in the selected mesh
+        format. Results go to results.jsonl in the chosen folder, so running
+        the same export again resumes it.
+        """
+        import volume_batch
+        path = filedialog.askopenfilename(
+            filetypes=[("Jobs or sweep files", "*.json *.csv"), ("All files", "*.*")],
+            title="Choose a jobs or sweep file"
+        )
+        if not path:
+            return
+        output_dir = filedialog.askdirectory(title="Choose a folder for the meshes")
+        if not output_dir:
+            return
         try:
-            # For demonstration, we'll just export to STL and show a message
-            self.export_to_stl()
-            
-            # In a real implementation, you would:
-            # 1. Export to STL
-            # 2. Send to printer software via API
-            # 3. Show printer status/dialog
+            specs = volume_batch.export_specs(volume_batch.load_sweep_specs(path),
+                                              self.export_format_var.get())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not read {path}: {e}")
+            return
+        results_path = os.path.join(output_dir, "results.jsonl")
+        
+        def work(progress):
+            def report(done, total):
+                progress(done / total, f"Exported {done}/{total} meshes")
+            return volume_batch.run_sweep(specs, results_path, output_dir=output_dir,
+                                          progress=report)
+        
+        def done(counts):
+            completed, skipped = counts
+            self.status_var.set(f"Exported {completed} meshes to {output_dir} "
+                                f"({skipped} already there)")
+            messagebox.showinfo("Batch Export", f"Exported {completed} meshes to {output_dir}.\n\n"
+                                f"See {results_path} for the status of each job.")
+        
+        self.start_task("Batch export", work, done)
+    
+    def send_to_printer(self):
+        """Mesh the model in the print queue and upload it to the printer
+        
+        Meshing and the upload run in the background and report to the status
+        bar. Without a printer URL the model is exported to a file instead,
+        to be loaded into a slicer by hand.
+        """
+        url = self.printer_url_var.get().strip()
+        if not url:
+            def saved(filename):
+                messagebox.showinfo("3D Printing", 
+                                  "No printer URL is set, so the model has been saved instead.\n\n"
+                                  "Load it into your slicer software, or enter the URL and API key "
+                                  "of an OctoPrint server to send models to the printer directly.")
             
-            messagebox.showinfo("3D Printing", 
-                              "In a full implementation, this would send the model to your 3D printer.\n\n"
-                              "For now, the STL file has been saved and can be manually loaded into your slicer software.")
+            self.export_to_stl(on_saved=saved)
+            return
+        
+        try:
+            job = self.current_job()
+            print_queue = self.get_print_queue(url, self.printer_key_var.get().strip())
+            print_queue.submit(job)
+            self.status_var.set(f"Print job {job.name}: queued")
+            if self.print_poll_after is None:
+                self.print_poll_after = self.root.after(self.PRINT_POLL_MS, self.poll_print_queue)
             
         except Exception as e:
             messagebox.showerror("Error", f"Print error: {e}")
     
-    def display_results(self, funcs, revolve_index, a, b, dx, volume):
-        """Display results in the text area"""
-        func_strs = [self.func1.get(), self.func2.get(), self.func3.get()]
+    def current_job(self):
+        """The current inputs as a volume_engine.VolumeJob that writes an STL mesh
+        
+        Printers take STL uploads, whatever the selected export format.
+        """
+        func_strs = [func_str for func_str in (self.func1.get(), self.func2.get(), self.func3.get())
+                     if func_str.strip()]
+        spec = {
+            "name": time.strftime("revolution-%Y%m%d-%H%M%S"),
+            "functions": func_strs,
+            "revolve_index": {"f₁(x)": 0, "f₂(x)": 1, "f₃(x)": 2}[self.func_var.get()],
+            "a": self.a_var.get(), "b": self.b_var.get(), "dx": self.dx_var.get(),
+            "axis": self.axis_var.get(), "method": self.method_var.get(),
+            "offset": self.offset_var.get(), "integrator": self.integrator_var.get(),
+            "tolerance": self.tolerance_var.get(), "mesh": self.mesh_mode_var.get(),
+            "resolution": self.resolution_var.get(),
+            "mesh_tolerance": self.mesh_tolerance_var.get(),
+            "stl": "true", "format": "stl",
+        }
+        return volume_engine.job_from_spec(spec)
+    
+    def get_print_queue(self, url, api_key):
+        """The print queue (started on first use), sending to the printer at url"""
+        from volume_printing import OctoPrintClient, PrintQueue
+        client = self.print_queue.client if self.print_queue is not None else None
+        if client is None or (client.url, client.api_key) != (url, api_key):
+            client = OctoPrintClient(url, api_key)
+        if self.print_queue is None:
+            self.print_queue = PrintQueue(client, workers=self.PRINT_WORKERS,
+                                          cache_dir=self.cache.directory)
+        self.print_queue.client = client
+        return self.print_queue
+    
+    def poll_print_queue(self):
+        """Show print job status changes; runs on a timer while jobs are unfinished"""
+        from volume_printing import DONE, FAILED
+        self.print_poll_after = None
+        while True:
+            try:
+                status = self.print_queue.events.get_nowait()
+            except queue.Empty:
+                break
+            message = status.message or status.state
+            if status.state == DONE:
+                message += f" ({status.filename})"
+            self.status_var.set(f"Print job {status.name}: {message}")
+            if status.state == FAILED:
+                messagebox.showerror("3D Printing", f"Print job {status.name} failed:\n{status.message}")
+        
+        if self.print_queue.pending():
+            self.print_poll_after = self.root.after(self.PRINT_POLL_MS, self.poll_print_queue)
+    
+    def display_results(self, funcs, revolve_index, a, b, dx, axis, method, offset,
+                        cross_sections, result, metrics=None):
+        """Display results (and the per-stage timing in metrics) in the text area"""
+        func_strs = [func.source for func in funcs]
         
         results = "=" * 60 + "\n"
         results += "VOLUME OF REVOLUTION - RESULTS\n"
@@ -451,50 +786,78 @@ class VolumeCalculator:
                 results += f"  f{i+1}(x) = {func_str}{revolve_ind}\n"
         
         results += f"\nPARAMETERS:\n"
-        results += f"  Axis of revolution: {self.axis_var.get().upper()}-axis\n"
+        if offset:
+            line = f"{'y' if axis == 'x' else 'x'} = {offset:g}"
+            results += f"  Axis of revolution: {line} (parallel to the {axis.upper()}-axis)\n"
+        else:
+            results += f"  Axis of revolution: {axis.upper()}-axis\n"
         results += f"  Lower limit (a): {a}\n"
         results += f"  Upper limit (b): {b}\n"
-        results += f"  Method: {self.method_var.get().title()}\n"
+        results += f"  Method: {method.title()}\n"
         results += f"  Δx step size: {dx}\n"
-        results += f"  Show cross-sections: {'Yes' if self.cross_section_var.get() else 'No'}\n"
+        results += f"  Integrator: {result.integrator}\n"
+        results += f"  Show cross-sections: {'Yes' if cross_sections else 'No'}\n"
         
         results += f"\nRESULTS:\n"
-        results += f"  Calculated Volume: {volume:.6f} cubic units\n"
+        results += f"  Calculated Volume: {result.volume:.6f} cubic units\n"
+        results += f"  Error estimate: ±{result.error:.3e}\n"
+        results += f"  Integrand evaluations: {result.evaluations:,}\n"
+        if result.crossings:
+            points = ", ".join(f"{x:.6g}" for x in result.crossings)
+            results += f"  Curves cross at x = {points} ({len(result.crossings) + 1} pieces)\n"
+        
+        if metrics is not None:
+            results += f"\nTIMING:\n"
+            for line in metrics.format_lines():
+                results += f"  {line}\n"
         
         # Add STL export info
-        if STL_AVAILABLE:
-            results += f"\nEXPORT:\n"
-            results += f"  3D model can be exported as STL for 3D printing\n"
-        else:
-            results += f"\nNOTE:\n"
-            results += f"  Install numpy-stl for 3D export: pip install numpy-stl\n"
+        results += f"\nEXPORT:\n"
+        results += f"  3D model can be exported as STL for 3D printing\n"
             
         results += "=" * 60
         
         self.results_text.delete(1.0, tk.END)
         self.results_text.insert(1.0, results)
     
+    def report_startup(self, timer, path=None, timeout_ms=30000):
+        """Time the first paint and first preview, print the report and quit"""
+        timer.mark("first paint")
+        self.root.update()
+        timer.mark("first preview")
+        waited = [0]
+        
+        def check():
+            waited[0] += 50
+            busy = self.task is not None or self.preview_after is not None
+            if busy and waited[0] < timeout_ms:
+                self.root.after(50, check)
+                return
+            timer.finish()
+            timer.write(path)
+            self.root.destroy()
+        
+        self.root.after(50, check)
+    
     def run(self):
         """Start the application"""
         self.root.mainloop()
+        if self.print_queue is not None:
+            self.print_queue.close()
 
 if __name__ == "__main__":
-    # Check if required packages are installed
-    try:
-        import numpy as np
-        import matplotlib.pyplot as plt
-        from mpl_toolkits.mplot3d import Axes3D
-        import sympy as sp
-    except ImportError as e:
-        print(f"Missing required package: {e}")
+    # Check if required packages are installed (without importing them)
+    missing = [name for name in ("numpy", "matplotlib", "sympy")
+               if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"Missing required package: {', '.join(missing)}")
         print("Please install required packages:")
         print("pip install numpy matplotlib sympy")
         sys.exit(1)
     
-    # Check for STL support
-    if not STL_AVAILABLE:
-        print("Note: numpy-stl not installed. 3D export will not be available.")
-        print("Install with: pip install numpy-stl")
-    
+    if startup_timer is not None:
+        startup_timer.mark("window")
     app = VolumeCalculator()
+    if startup_timer is not None:
+        app.report_startup(startup_timer, STARTUP_REPORT.partition("=")[2] or None)
     app.run()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Volume of Revolution Calculator - headless batch runner
+
+Runs volume and mesh export jobs from a JSON or CSV file without a display:
+
+    python volume_cli.py jobs.json --output results.csv --output-dir meshes
+
+A JSON file holds a list of job objects (or {"jobs": [...]}); a CSV file has
+one job per row. Job fields match volume_engine.VolumeJob, with functions
+given as a "functions" list or f1/f2/f3 columns.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+from volume_engine import job_from_spec, run_job
+from volume_cache import DEFAULT_CACHE_DIR, ResultCache
+
+RESULT_FIELDS = ["name", "volume", "error", "evaluations", "integrator", "crossings",
+                 "stl", "triangles", "status"]
+
+
+def load_job_specs(path):
+    """Read job spec dicts from a JSON or CSV file"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as fh:
+            return list(csv.DictReader(fh))
+    with open(path) as fh:
+        specs = json.load(fh)
+    if isinstance(specs, dict):
+        specs = specs.get("jobs", [specs])
+    return specs
+
+
+def run_specs(specs, output_dir=".", cache=None):
+    """Run every job spec, recording failures instead of stopping"""
+    results = []
+    for index, spec in enumerate(specs):
+        try:
+            record = run_job(job_from_spec(spec, index), output_dir, cache)
+            record["status"] = "ok"
+        except Exception as e:
+            record = {"name": spec.get("name") or f"job{index + 1}", "status": f"error: {e}"}
+        results.append(record)
+    return results
+
+
+def write_results(results, path):
+    """Write results as CSV or JSON (by extension), or JSON to stdout"""
+    if path is None:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for record in results:
+                # Crossings are written ';'-separated, like the functions column
+                crossings = record.get("crossings")
+                if crossings is not None:
+                    record = dict(record, crossings=";".join(f"{x:.15g}" for x in crossings))
+                writer.writerow(record)
+    else:
+        with open(path, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute volumes of revolution and STL meshes in batch")
+    parser.add_argument("jobs", help="JSON or CSV file of job specs")
+    parser.add_argument("--output", "-o", help="results file (.json or .csv); defaults to stdout")
+    parser.add_argument("--output-dir", "-d", default=".", help="directory for mesh files")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="directory of cached results reused across runs")
+    parser.add_argument("--no-cache", action="store_true", help="always recompute")
+    args = parser.parse_args(argv)
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    results = run_specs(load_job_specs(args.jobs), args.output_dir, cache)
+    write_results(results, args.output)
+    return 0 if all(record["status"] == "ok" for record in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1390 @@
+"""
+Volume of Revolution Calculator - computation engine
+
+Expression parsing, volume integration and mesh generation without any Tk or
+matplotlib dependency, shared by the GUI and the headless batch runner.
+
+SymPy and numpy-stl are imported on first use rather than at import time, so
+loading this module (and starting the GUI) only costs NumPy.
+"""
+
+import os
+import re
+import time
+import importlib.util
+import struct
+import zipfile
+import datetime
+import functools
+import threading
+import contextlib
+import concurrent.futures
+from collections import namedtuple, OrderedDict
+
+import numpy as np
+
+from volume_metrics import span, count
+
+# Optional STL support (only needed for numpy-stl Mesh objects; the
+# streaming writer below produces STL files without it). Checked without
+# importing the package.
+STL_AVAILABLE = importlib.util.find_spec("stl") is not None
+
+# Module prefixes accepted for backwards compatibility with the old eval parser
+_MODULE_PREFIX = re.compile(r'\b(?:np|numpy|math|sp|sympy)\.')
+
+
+@functools.lru_cache(maxsize=None)
+def symbol_x():
+    """The real SymPy symbol x that expressions are written in"""
+    import sympy as sp
+    return sp.Symbol('x', real=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _expression_names():
+    """NumPy spellings mapped onto their SymPy equivalents"""
+    import sympy as sp
+    return {
+        'x': symbol_x(),
+        'e': sp.E,
+        'arcsin': sp.asin, 'arccos': sp.acos, 'arctan': sp.atan, 'arctan2': sp.atan2,
+        'arcsinh': sp.asinh, 'arccosh': sp.acosh, 'arctanh': sp.atanh,
+        'absolute': sp.Abs, 'abs': sp.Abs, 'power': sp.Pow,
+        'log10': lambda arg: sp.log(arg, 10), 'log2': lambda arg: sp.log(arg, 2),
+        'log1p': lambda arg: sp.log(1 + arg), 'expm1': lambda arg: sp.exp(arg) - 1,
+        'exp2': lambda arg: 2**arg, 'square': lambda arg: arg**2,
+        'hypot': lambda a, b: sp.sqrt(a**2 + b**2),
+        'maximum': sp.Max, 'minimum': sp.Min, 'fabs': sp.Abs,
+        'where': lambda condition, a, b: sp.Piecewise((a, condition), (b, True)),
+    }
+
+
+def normalize_expression(func_str):
+    """Canonical text of an expression, used as the compile cache key"""
+    return ''.join(_MODULE_PREFIX.sub('', func_str).split())
+
+
+class CompiledExpression:
+    """A user expression parsed by SymPy and lambdified to NumPy ufunc code"""
+    
+    def __init__(self, source, expr):
+        import sympy as sp
+        self.source = source
+        self.expr = expr
+        self._func = sp.lambdify(symbol_x(), expr, modules='numpy')
+    
+    def __call__(self, x):
+        return self._func(x)
+    
+    def __repr__(self):
+        return f"CompiledExpression({self.source!r})"
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_normalized(normalized):
+    import sympy as sp
+    from sympy.parsing.sympy_parser import (parse_expr, standard_transformations,
+                                            convert_xor)
+    try:
+        expr = parse_expr(normalized, local_dict=dict(_expression_names()),
+                          transformations=standard_transformations + (convert_xor,))
+    except Exception as e:
+        raise ValueError(f"Could not parse expression: {e}") from e
+    if not isinstance(expr, sp.Expr):
+        raise ValueError("Expression does not evaluate to a number")
+    unknown = expr.free_symbols - {symbol_x()}
+    if unknown:
+        names = ", ".join(sorted(str(symbol) for symbol in unknown))
+        raise ValueError(f"Unknown symbol(s): {names}")
+    undefined = expr.atoms(sp.core.function.AppliedUndef)
+    if undefined:
+        names = ", ".join(sorted(str(func.func) for func in undefined))
+        raise ValueError(f"Unknown function(s): {names}")
+    return CompiledExpression(normalized, expr)
+
+
+def compile_expression(func_str):
+    """Compile an expression string into an array-capable callable (cached)"""
+    return _compile_normalized(normalize_expression(func_str))
+
+
+def evaluate_on_grid(func, x_vals):
+    """Evaluate func over an array of samples in one call
+    
+    Expressions that only work on scalars (or return a constant) fall back to
+    per-sample evaluation or are broadcast to the shape of x_vals.
+    """
+    try:
+        values = np.asarray(func(x_vals), dtype=float)
+    except Exception:
+        values = None
+    if values is None or values.shape not in (x_vals.shape, ()):
+        values = np.array([func(x) for x in x_vals], dtype=float)
+    count("samples", x_vals.size)
+    return np.broadcast_to(values, x_vals.shape)
+
+
+def revolution_integrand(funcs, revolve_index, axis, method, offset=0.0):
+    """Build the signed disk/washer/shell integrand as a function of an x array
+    
+    The solid turns about the line y = offset (axis 'x') or x = offset
+    (axis 'y'). Disk and washer radii are measured from that line; shells
+    have radius x - offset. The integrand is negative where the inner curve
+    lies outside the outer one (or a shell lies left of its axis), so the
+    volume is the sum of |integral| over the pieces between its crossings.
+    """
+    def integrand(x_vals):
+        values = [evaluate_on_grid(func, x_vals) for func in funcs]
+        if axis == 'x':
+            # Revolution around the horizontal line y = offset
+            outer_sq = (values[revolve_index] - offset) ** 2
+            if method == 'disk':
+                return np.pi * outer_sq
+            inner_sq = np.zeros_like(outer_sq)
+            for i, vals in enumerate(values):
+                if i != revolve_index:
+                    inner_sq += (vals - offset) ** 2
+            return np.pi * (outer_sq - inner_sq)
+        
+        # Revolution around the vertical line x = offset (shell method)
+        height = np.array(values[revolve_index])
+        if method == 'washer' and len(funcs) > 1:
+            for i, vals in enumerate(values):
+                if i != revolve_index:
+                    height -= vals
+        return 2 * np.pi * (x_vals - offset) * height
+    
+    return integrand
+
+
+class JobCancelled(Exception):
+    """Raised from a progress callback to stop a computation cooperatively"""
+
+
+def _report(progress, fraction, message):
+    """Forward progress (fraction in [0, 1] or None when unknown) if a callback is set"""
+    if progress is not None:
+        progress(fraction, message)
+
+
+# crossings holds the points where [a, b] was split (see find_crossings)
+IntegrationResult = namedtuple('IntegrationResult',
+                               ['volume', 'error', 'evaluations', 'integrator', 'crossings'],
+                               defaults=((),))
+
+INTEGRATORS = ["riemann", "simpson", "gauss-legendre", "gauss-kronrod", "symbolic"]
+
+# Refinement limits for the tolerance-driven integrators
+MAX_SIMPSON_PANELS = 2 ** 22
+MAX_GAUSS_PANELS = 2 ** 16
+MAX_KRONROD_INTERVALS = 4096
+
+GAUSS_LEGENDRE_ORDER = 10
+
+# The Riemann sum is evaluated in blocks of this many samples, bounding memory
+# and giving progress/cancellation checkpoints
+RIEMANN_CHUNK_SAMPLES = 1_000_000
+
+# Seconds to wait for SymPy before falling back to numeric integration
+SYMBOLIC_TIMEOUT = 5.0
+SYMBOLIC_FALLBACK = "gauss-kronrod"
+MAX_CACHED_ANTIDERIVATIVES = 128
+
+# Sign changes of the integrand are looked for on this many samples
+CROSSING_SAMPLES = 257
+MAX_BISECTION_STEPS = 1100
+
+# 15-point Kronrod nodes/weights on [-1, 1] with the embedded 7-point Gauss rule
+# (QUADPACK qk15), listed from the left end of the interval to the right
+_KRONROD_HALF_NODES = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0])
+_KRONROD_HALF_WEIGHTS = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_GAUSS7_HALF_WEIGHTS = np.array([
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+KRONROD_NODES = np.concatenate((-_KRONROD_HALF_NODES[:7], _KRONROD_HALF_NODES[7::-1]))
+KRONROD_WEIGHTS = np.concatenate((_KRONROD_HALF_WEIGHTS, _KRONROD_HALF_WEIGHTS[6::-1]))
+GAUSS7_WEIGHTS = np.concatenate((_GAUSS7_HALF_WEIGHTS, _GAUSS7_HALF_WEIGHTS[2::-1]))
+
+
+def _target_error(volume, volume_abs, tolerance):
+    """Absolute error target for a relative tolerance
+    
+    volume_abs (the integral of |f|) keeps the target meaningful when the
+    signed volume cancels to zero.
+    """
+    return tolerance * max(abs(volume), volume_abs, np.finfo(float).tiny)
+
+
+def integrate_riemann(integrand, a, b, dx, tolerance=None, progress=None):
+    """Left Riemann sum with a fixed Δx step
+    
+    Samples are the same as np.arange(a, b, dx) but generated block by block.
+    """
+    samples = max(int(np.ceil((b - a) / dx)), 0)
+    if samples == 0:
+        return IntegrationResult(0.0, 0.0, 0, 'riemann')
+    step = (a + dx) - a  # np.arange's effective step
+    total = 0.0
+    for start in range(0, samples, RIEMANN_CHUNK_SAMPLES):
+        x_vals = a + np.arange(start, min(start + RIEMANN_CHUNK_SAMPLES, samples)) * step
+        values = integrand(x_vals)
+        if start == 0:
+            f_a = values[0]
+        total += np.sum(values)
+        _report(progress, min(start + RIEMANN_CHUNK_SAMPLES, samples) / samples, "Integrating")
+    volume = float(total * dx)
+    # Leading error term of the left rule: dx/2 * (f(b) - f(a))
+    f_b = integrand(np.array([float(b)]))[0]
+    error = abs(0.5 * dx * (f_b - f_a))
+    return IntegrationResult(volume, float(error), samples + 1, 'riemann')
+
+
+def _simpson_sum(values, h):
+    return h / 3 * (values[0] + 4 * values[1:-1:2].sum()
+                    + 2 * values[2:-1:2].sum() + values[-1])
+
+
+def integrate_simpson(integrand, a, b, dx=None, tolerance=1e-9, progress=None):
+    """Composite Simpson's rule, doubling panels until the Richardson error estimate meets the tolerance"""
+    panels = 8
+    h = (b - a) / panels
+    values = integrand(np.linspace(a, b, panels + 1))
+    evaluations = panels + 1
+    previous = _simpson_sum(values, h)
+    while True:
+        # The midpoints of the current panels are the only new nodes
+        midpoints = a + h * (np.arange(panels) + 0.5)
+        refined = np.empty(2 * panels + 1)
+        refined[0::2] = values
+        refined[1::2] = integrand(midpoints)
+        evaluations += panels
+        values = refined
+        panels *= 2
+        h /= 2
+        volume = _simpson_sum(values, h)
+        error = abs(volume - previous) / 15
+        target = _target_error(volume, _simpson_sum(np.abs(values), h), tolerance)
+        if error <= target or panels >= MAX_SIMPSON_PANELS:
+            break
+        _report(progress, None, f"Integrating ({panels:,} panels)")
+        previous = volume
+    return IntegrationResult(float(volume), float(error), evaluations, 'simpson')
+
+
+def integrate_gauss_legendre(integrand, a, b, dx=None, tolerance=1e-9, progress=None):
+    """Composite Gauss-Legendre rule, doubling panels until successive estimates agree"""
+    nodes, weights = np.polynomial.legendre.leggauss(GAUSS_LEGENDRE_ORDER)
+    
+    def composite(panels):
+        edges = np.linspace(a, b, panels + 1)
+        half = 0.5 * (edges[1:] - edges[:-1])
+        centers = 0.5 * (edges[1:] + edges[:-1])
+        values = integrand((centers[:, None] + half[:, None] * nodes).ravel())
+        values = values.reshape(panels, len(nodes))
+        return float(np.sum(half * (values @ weights))), float(np.sum(half * (np.abs(values) @ weights)))
+    
+    panels = 1
+    previous, _ = composite(panels)
+    evaluations = GAUSS_LEGENDRE_ORDER
+    while True:
+        panels *= 2
+        volume, volume_abs = composite(panels)
+        evaluations += panels * GAUSS_LEGENDRE_ORDER
+        error = abs(volume - previous)
+        if error <= _target_error(volume, volume_abs, tolerance) or panels >= MAX_GAUSS_PANELS:
+            break
+        _report(progress, None, f"Integrating ({panels:,} panels)")
+        previous = volume
+    return IntegrationResult(volume, error, evaluations, 'gauss-legendre')
+
+
+def _kronrod_intervals(integrand, lo, hi):
+    """Apply the 15-point Kronrod rule to many intervals in a single batched call"""
+    half = 0.5 * (hi - lo)
+    centers = 0.5 * (hi + lo)
+    values = integrand((centers[:, None] + half[:, None] * KRONROD_NODES).ravel())
+    values = values.reshape(len(lo), len(KRONROD_NODES))
+    kronrod = half * (values @ KRONROD_WEIGHTS)
+    gauss = half * (values[:, 1::2] @ GAUSS7_WEIGHTS)
+    kronrod_abs = np.abs(half) * (np.abs(values) @ KRONROD_WEIGHTS)
+    return kronrod, np.abs(kronrod - gauss), kronrod_abs
+
+
+def integrate_gauss_kronrod(integrand, a, b, dx=None, tolerance=1e-9, progress=None):
+    """Adaptive Gauss-Kronrod (G7/K15) quadrature
+    
+    Every pass bisects all intervals whose error exceeds their share of the
+    error budget and evaluates the new halves together.
+    """
+    lo = np.linspace(a, b, 5)[:-1]
+    hi = np.linspace(a, b, 5)[1:]
+    volumes, errors, volumes_abs = _kronrod_intervals(integrand, lo, hi)
+    evaluations = len(lo) * len(KRONROD_NODES)
+    width = abs(b - a) or 1.0
+    while True:
+        # NaN errors would never be split, so the loop could not finish
+        if not (np.all(np.isfinite(volumes)) and np.all(np.isfinite(errors))):
+            raise ValueError("Integrand is not finite on [a, b]")
+        volume = volumes.sum()
+        error = errors.sum()
+        target = _target_error(volume, volumes_abs.sum(), tolerance)
+        if error <= target or len(lo) >= MAX_KRONROD_INTERVALS:
+            break
+        _report(progress, None, f"Integrating ({len(lo):,} intervals)")
+        split = errors > target * np.abs(hi - lo) / width
+        if not split.any():
+            split = errors == errors.max()
+        mid = 0.5 * (lo[split] + hi[split])
+        new_lo = np.concatenate((lo[split], mid))
+        new_hi = np.concatenate((mid, hi[split]))
+        new_volumes, new_errors, new_abs = _kronrod_intervals(integrand, new_lo, new_hi)
+        evaluations += len(new_lo) * len(KRONROD_NODES)
+        keep = ~split
+        lo = np.concatenate((lo[keep], new_lo))
+        hi = np.concatenate((hi[keep], new_hi))
+        volumes = np.concatenate((volumes[keep], new_volumes))
+        errors = np.concatenate((errors[keep], new_errors))
+        volumes_abs = np.concatenate((volumes_abs[keep], new_abs))
+    return IntegrationResult(float(volume), float(error), evaluations, 'gauss-kronrod')
+
+
+INTEGRATOR_FUNCTIONS = {
+    "riemann": integrate_riemann,
+    "simpson": integrate_simpson,
+    "gauss-legendre": integrate_gauss_legendre,
+    "gauss-kronrod": integrate_gauss_kronrod,
+}
+
+
+def integrate(integrand, a, b, dx, integrator="riemann", tolerance=1e-9, progress=None):
+    """Integrate with the named integrator and return an IntegrationResult"""
+    if integrator not in INTEGRATOR_FUNCTIONS:
+        raise ValueError(f"Unknown integrator: {integrator}")
+    return INTEGRATOR_FUNCTIONS[integrator](integrand, a, b, dx, tolerance, progress)
+
+
+class SymbolicIntegrationError(Exception):
+    """Raised when no usable closed form is available for a volume"""
+
+
+class _AbandonedIntegral(SymbolicIntegrationError):
+    """An integral stopped because a different one was started"""
+
+
+# Antiderivatives keyed by (expressions, revolve index, axis, method). Each
+# entry is a Future so a slow integral that times out can still finish in the
+# background and be picked up by the next request for it.
+_antiderivatives = OrderedDict()
+_antiderivatives_lock = threading.Lock()
+_symbolic_worker = None
+
+
+def symbolic_integrand(exprs, revolve_index, axis, method, offset=0.0):
+    """SymPy version of revolution_integrand"""
+    import sympy as sp
+    offset = sp.nsimplify(offset)
+    if axis == 'x':
+        outer_sq = (exprs[revolve_index] - offset) ** 2
+        if method == 'disk':
+            return sp.pi * outer_sq
+        inner_sq = sum(((expr - offset) ** 2 for i, expr in enumerate(exprs)
+                        if i != revolve_index), sp.Integer(0))
+        return sp.pi * (outer_sq - inner_sq)
+    
+    height = exprs[revolve_index]
+    if method == 'washer' and len(exprs) > 1:
+        for i, expr in enumerate(exprs):
+            if i != revolve_index:
+                height = height - expr
+    return 2 * sp.pi * (symbol_x() - offset) * height
+
+
+def _symbolic_worker_main(conn):
+    """Child process loop: integrate each expression received on conn"""
+    import sympy as sp
+    x = symbol_x()
+    while True:
+        try:
+            integrand = conn.recv()
+        except EOFError:
+            return
+        try:
+            antiderivative = sp.integrate(integrand, x)
+            if antiderivative.has(sp.Integral):
+                conn.send((False, "no closed-form antiderivative"))
+            else:
+                conn.send((True, antiderivative))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+class _SymbolicWorker:
+    """A SymPy process that integrates one expression at a time
+    
+    sp.integrate cannot be interrupted, so it runs in a child process rather
+    than a thread. Starting an integral while another is still running kills
+    the process (the old Future fails with _AbandonedIntegral) and starts a
+    fresh one, so at most one integral ever runs and none is left behind
+    competing with the caller for the GIL.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.future = None
+    
+    def submit(self, integrand):
+        """Future of the lambdified antiderivative of integrand"""
+        future = concurrent.futures.Future()
+        with self.lock:
+            if self.future is not None and not self.future.done():
+                self._stop()
+            if self.process is None:
+                import multiprocessing
+                context = multiprocessing.get_context("spawn")
+                self.conn, child = context.Pipe()
+                self.process = context.Process(target=_symbolic_worker_main, args=(child,),
+                                               daemon=True)
+                self.process.start()
+                child.close()
+                threading.Thread(target=self._read, args=(self.conn,), daemon=True).start()
+            self.future = future
+            self.conn.send(integrand)
+        return future
+    
+    def _stop(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = self.conn = None
+        self.future.set_exception(_AbandonedIntegral("stopped for a newer integral"))
+    
+    def _read(self, conn):
+        """Hand each result from the process on conn to the waiting Future"""
+        import sympy as sp
+        while True:
+            try:
+                ok, value = conn.recv()
+            except (EOFError, OSError):
+                # Killed by _stop, or the process died (then the next integral restarts it)
+                with self.lock:
+                    if self.conn is conn:
+                        self.process.join()
+                        conn.close()
+                        self.process = self.conn = None
+                        if not self.future.done():
+                            self.future.set_exception(
+                                SymbolicIntegrationError("the SymPy process exited"))
+                return
+            try:
+                result = sp.lambdify(symbol_x(), value, modules='numpy') if ok else None
+            except Exception as e:
+                ok, value = False, str(e)
+            with self.lock:
+                if self.conn is not conn:
+                    return
+                if self.future.done():
+                    continue
+                if ok:
+                    self.future.set_result(result)
+                else:
+                    self.future.set_exception(SymbolicIntegrationError(value))
+
+
+def _antiderivative_future(key, integrand):
+    """Return (future, created) for the antiderivative memoized under key"""
+    global _symbolic_worker
+    with _antiderivatives_lock:
+        future = _antiderivatives.get(key)
+        # An abandoned integral is started again rather than reported as failed
+        abandoned = (future is not None and future.done()
+                     and isinstance(future.exception(), _AbandonedIntegral))
+        if future is not None and not abandoned:
+            _antiderivatives.move_to_end(key)
+            return future, False
+        if _symbolic_worker is None:
+            _symbolic_worker = _SymbolicWorker()
+        future = _symbolic_worker.submit(integrand)
+        _antiderivatives[key] = future
+        _antiderivatives.move_to_end(key)
+        if len(_antiderivatives) > MAX_CACHED_ANTIDERIVATIVES:
+            _antiderivatives.popitem(last=False)
+    return future, True
+
+
+def integrate_symbolic(funcs, revolve_index, axis, method, a, b, timeout=SYMBOLIC_TIMEOUT,
+                       progress=None, offset=0.0):
+    """Exact signed integral of the integrand from a memoized closed-form antiderivative
+    
+    Raises SymbolicIntegrationError when the functions are not SymPy-backed,
+    SymPy finds no closed form within the timeout, or the integrand or the
+    closed form is not finite and continuous on [a, b] (checked on a grid).
+    """
+    if not all(isinstance(func, CompiledExpression) for func in funcs):
+        raise SymbolicIntegrationError("functions were not compiled from expressions")
+    
+    integrand = symbolic_integrand([func.expr for func in funcs],
+                                   revolve_index, axis, method, offset)
+    key = (tuple(func.source for func in funcs), revolve_index, axis, method, float(offset))
+    future, created = _antiderivative_future(key, integrand)
+    try:
+        # Only the request that started the integral waits for it; later ones
+        # use it once it is ready instead of blocking again. The wait is
+        # sliced so a progress callback can cancel it.
+        deadline = time.monotonic() + (timeout if created else 0)
+        while True:
+            _report(progress, None, "Integrating symbolically")
+            try:
+                antiderivative = future.result(
+                    timeout=min(max(deadline - time.monotonic(), 0), 0.1))
+                break
+            except concurrent.futures.TimeoutError:
+                if time.monotonic() >= deadline:
+                    raise
+    except concurrent.futures.TimeoutError:
+        if created:
+            raise SymbolicIntegrationError(f"timed out after {timeout:g}s") from None
+        raise SymbolicIntegrationError("closed form is still being computed") from None
+    except SymbolicIntegrationError:
+        raise
+    except Exception as e:
+        raise SymbolicIntegrationError(str(e)) from e
+    
+    # F(b) - F(a) only holds if the integrand is defined and F continuous on
+    # [a, b]. compute_volume splits at sign changes, so F must move the same
+    # way as the integrand across every cell of a grid; a pole (where F jumps
+    # back) or a region where the functions are undefined rules it out.
+    x_vals = np.linspace(a, b, CROSSING_SAMPLES)
+    integrand = revolution_integrand(funcs, revolve_index, axis, method, offset)
+    with np.errstate(all='ignore'):
+        values = np.asarray(integrand(x_vals), dtype=float)
+        closed_form = np.broadcast_to(np.asarray(antiderivative(x_vals), dtype=complex),
+                                      x_vals.shape)
+    if not np.all(np.isfinite(values)):
+        raise SymbolicIntegrationError("integrand is not finite on [a, b]")
+    if np.any(closed_form.imag != 0) or not np.all(np.isfinite(closed_form.real)):
+        raise SymbolicIntegrationError("closed form is not finite on [a, b]")
+    steps = np.diff(closed_form.real) * np.sign(values.sum()) * np.sign(b - a)
+    if np.any(steps < -1e-9 * np.abs(closed_form.real).max()):
+        raise SymbolicIntegrationError("closed form is not continuous on [a, b]")
+    volume = closed_form.real[-1] - closed_form.real[0]
+    return IntegrationResult(float(volume), 0.0, 2 * CROSSING_SAMPLES, 'symbolic')
+
+
+def find_crossings(func, a, b, samples=CROSSING_SAMPLES):
+    """Points strictly between a and b where func changes sign
+    
+    func is sampled on a uniform grid, each sign change between neighbouring
+    samples is bracketed, and all brackets are bisected together with one
+    array evaluation per step. Bisection runs until the brackets are adjacent
+    floats, so a crossing does not depend on the grid it was found from (and
+    cached pieces keep their keys). Sign changes closer together than the
+    grid spacing can be missed. Returns (crossings ordered from a to b,
+    evaluations).
+    """
+    x_vals = np.linspace(a, b, samples)
+    with np.errstate(all='ignore'):
+        values = np.asarray(func(x_vals), dtype=float)
+    evaluations = samples
+    finite = np.isfinite(values)
+    nonzero = np.flatnonzero(finite & (values != 0))
+    left, right = nonzero[:-1], nonzero[1:]
+    change = np.sign(values[left]) != np.sign(values[right])
+    left, right = left[change], right[change]
+    
+    # Samples between a non-adjacent pair are zeros (or invalid): a sign
+    # change across a run of exact zeros is split in the middle of the run
+    invalid = np.cumsum(~finite)
+    on_grid = (right > left + 1) & (invalid[right - 1] == invalid[left])
+    roots = [x_vals[(left[on_grid] + right[on_grid]) // 2]]
+    
+    bracketed = right == left + 1
+    lo, hi = x_vals[left[bracketed]], x_vals[right[bracketed]]
+    lo_sign = np.sign(values[left[bracketed]])
+    for _ in range(MAX_BISECTION_STEPS):
+        mid = 0.5 * (lo + hi)
+        active = (mid != lo) & (mid != hi)
+        if not active.any():
+            break
+        with np.errstate(all='ignore'):
+            same = np.sign(func(mid[active])) == lo_sign[active]
+        evaluations += int(active.sum())
+        lo[active] = np.where(same, mid[active], lo[active])
+        hi[active] = np.where(same, hi[active], mid[active])
+    # hi is the first float past the crossing (an exact zero, if there is one)
+    roots.append(hi)
+    
+    roots = np.sort(np.concatenate(roots))
+    return (roots if a <= b else roots[::-1]), evaluations
+
+
+def volume_crossings(funcs, revolve_index, a, b, axis, method, offset=0.0):
+    """Where the outer and inner curves (or shell and axis) trade places on (a, b)
+    
+    Returns (crossings, evaluations) for the integrand of revolution_integrand.
+    Disks never change sign, so no search is needed for them.
+    """
+    if axis == 'x' and method == 'disk':
+        return np.empty(0), 0
+    with span("intersections"):
+        crossings, evaluations = find_crossings(
+            revolution_integrand(funcs, revolve_index, axis, method, offset), a, b)
+    count("evaluations", evaluations)
+    return crossings, evaluations
+
+
+def compute_volume(funcs, revolve_index, a, b, dx, axis, method,
+                   integrator="riemann", tolerance=1e-9, progress=None, offset=0.0,
+                   piece_volume=None):
+    """Volume of revolution with the named integrator
+    
+    offset places the axis on the line y = offset (axis 'x') or x = offset
+    (axis 'y'). [a, b] is split where the curves cross (see volume_crossings)
+    and each piece is integrated on its own, so outer and inner radii are
+    ordered correctly on every piece. piece_volume, when given, replaces
+    integrate_piece (same arguments) for the pieces of a split interval, for
+    example to reuse cached pieces. The symbolic integrator falls back to
+    numeric quadrature when no closed form is available.
+    """
+    crossings, evaluations = volume_crossings(funcs, revolve_index, a, b, axis, method, offset)
+    edges = [a, *crossings, b]
+    if piece_volume is None or len(edges) == 2:
+        piece_volume = integrate_piece
+    pieces = []
+    for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+        pieces.append(piece_volume(funcs, revolve_index, lo, hi, dx, axis, method, integrator,
+                                   tolerance, _piece_progress(progress, i, len(edges) - 1),
+                                   offset))
+    
+    # A fallback or other note on any piece is kept in the combined label
+    label = next((piece.integrator for piece in pieces if piece.integrator != integrator),
+                 integrator)
+    return IntegrationResult(float(sum(abs(piece.volume) for piece in pieces)),
+                             float(sum(piece.error for piece in pieces)),
+                             evaluations + sum(piece.evaluations for piece in pieces),
+                             label, tuple(float(x) for x in crossings))
+
+
+def _piece_progress(progress, index, pieces):
+    """Progress callback mapping one piece's fractions onto the whole interval"""
+    if progress is None or pieces == 1:
+        return progress
+    
+    def report(fraction, message):
+        progress(None if fraction is None else (index + fraction) / pieces, message)
+    return report
+
+
+def integrate_piece(funcs, revolve_index, a, b, dx, axis, method, integrator="riemann",
+                    tolerance=1e-9, progress=None, offset=0.0):
+    """Signed integral of the revolution integrand over one piece of [a, b]"""
+    with span("integrate"):
+        result = _integrate_piece(funcs, revolve_index, a, b, dx, axis, method, integrator,
+                                  tolerance, progress, offset)
+    count("evaluations", result.evaluations)
+    return result
+
+
+def _integrate_piece(funcs, revolve_index, a, b, dx, axis, method, integrator, tolerance,
+                     progress, offset):
+    integrand = revolution_integrand(funcs, revolve_index, axis, method, offset)
+    if integrator != "symbolic":
+        return integrate(integrand, a, b, dx, integrator, tolerance, progress)
+    try:
+        return integrate_symbolic(funcs, revolve_index, axis, method, a, b,
+                                  progress=progress, offset=offset)
+    except SymbolicIntegrationError as e:
+        result = integrate(integrand, a, b, dx, SYMBOLIC_FALLBACK, tolerance, progress)
+        return result._replace(integrator=f"{result.integrator} (symbolic fallback: {e})")
+
+
+def revolution_vertices(radius, u, v, axis, offset=0.0):
+    """Vertex grid of shape (len(u), len(v), 3) for a surface of revolution
+    
+    radius holds the distance from the axis at each position u along it, v
+    holds the angles, and offset is where the axis crosses the other
+    coordinate (y for axis 'x', x for axis 'y').
+    """
+    along = np.broadcast_to(u[:, None], (len(u), len(v)))
+    across = radius[:, None] * np.cos(v)[None, :] + offset
+    depth = radius[:, None] * np.sin(v)[None, :]
+    if axis == 'x':
+        return np.stack((along, across, depth), axis=-1)
+    return np.stack((across, along, depth), axis=-1)
+
+
+def revolved_curve(func, x_vals, axis, offset=0.0):
+    """(positions along the axis, radii) of the curve y = func(x) turned about the axis
+    
+    About a horizontal line the curve's height is the radius; about the
+    vertical line x = offset each point circles at radius x - offset, at
+    height func(x).
+    """
+    values = evaluate_on_grid(func, x_vals)
+    if axis == 'x':
+        return x_vals, values - offset
+    return values, x_vals - offset
+
+
+def grid_faces(rows, cols):
+    """Triangle vertex indices for a rows x cols vertex grid, two per quad"""
+    i, j = np.meshgrid(np.arange(rows - 1), np.arange(cols - 1), indexing='ij')
+    v1 = (i * cols + j).ravel()
+    v2 = v1 + 1
+    v3 = v1 + cols
+    v4 = v3 + 1
+    faces = np.empty((len(v1), 2, 3), dtype=np.intp)
+    faces[:, 0] = np.stack((v1, v2, v3), axis=-1)
+    faces[:, 1] = np.stack((v2, v4, v3), axis=-1)
+    return faces.reshape(-1, 3)
+
+
+# Binary STL record layout (identical to numpy-stl's mesh.Mesh.dtype)
+STL_RECORD_DTYPE = np.dtype([('normals', '<f4', (3,)),
+                             ('vectors', '<f4', (3, 3)),
+                             ('attr', '<u2', (1,))])
+
+# Exports with at least this many triangles are streamed to disk strip by strip
+STREAM_EXPORT_MIN_TRIANGLES = 1_000_000
+STREAM_CHUNK_TRIANGLES = 65536
+
+
+def revolution_triangle_count(num_points):
+    """Number of triangles in the uniform num_points x num_points revolution mesh"""
+    return 2 * (num_points - 1) ** 2
+
+
+def iter_revolution_triangles(func, a, b, num_points, axis, chunk_triangles=STREAM_CHUNK_TRIANGLES,
+                              offset=0.0):
+    """Yield the uniform revolution mesh as float32 triangle arrays
+    
+    Triangles come out in the same order as generate_stl_mesh, one x-slice
+    strip at a time (several thin strips are grouped up to chunk_triangles),
+    so only one chunk of vertices and triangles is alive at once.
+    """
+    u, radius = revolved_curve(func, np.linspace(a, b, num_points), axis, offset)
+    v = np.linspace(0, 2*np.pi, num_points)
+    strip_triangles = 2 * (num_points - 1)
+    strips_per_chunk = max(1, chunk_triangles // max(strip_triangles, 1))
+    faces = grid_faces(strips_per_chunk + 1, num_points)
+    for start in range(0, num_points - 1, strips_per_chunk):
+        stop = min(start + strips_per_chunk, num_points - 1)
+        vertices = revolution_vertices(radius[start:stop + 1], u[start:stop + 1], v, axis,
+                                       offset)
+        vertices = vertices.reshape(-1, 3).astype(np.float32)
+        yield vertices[faces[:(stop - start) * strip_triangles]]
+
+
+def stl_header(name):
+    """80-byte binary STL header in the format numpy-stl writes"""
+    try:
+        from stl import __about__ as metadata
+        package_name, version = metadata.__package_name__, metadata.__version__
+    except ImportError:
+        package_name, version = 'numpy-stl', 'unknown'
+    header = f"{package_name} ({version}) {datetime.datetime.now()} {name}"
+    return header[:80].ljust(80, ' ').encode('ascii', 'replace')
+
+
+@contextlib.contextmanager
+def _removed_on_error(filename):
+    """Don't leave a truncated file behind (e.g. after a cancelled export)"""
+    try:
+        yield
+    except BaseException:
+        if os.path.exists(filename):
+            os.remove(filename)
+        raise
+
+
+def write_binary_stl(filename, triangle_chunks, triangle_count, name=None, progress=None):
+    """Stream triangles to a binary STL file without building the whole mesh
+    
+    triangle_chunks yields (n, 3, 3) arrays whose sizes add up to
+    triangle_count. Normals are computed per chunk exactly as numpy-stl does
+    on save, so the triangle records match mesh.Mesh.save byte for byte.
+    Returns the number of bytes written.
+    """
+    written = 0
+    with span("write STL"), _removed_on_error(filename), open(filename, 'wb') as fh:
+        fh.write(stl_header(name or os.path.basename(filename)))
+        fh.write(struct.pack('<I', triangle_count))
+        for vectors in triangle_chunks:
+            records = np.zeros(len(vectors), dtype=STL_RECORD_DTYPE)
+            records['vectors'] = vectors
+            vectors = records['vectors']
+            records['normals'] = np.cross(vectors[:, 1] - vectors[:, 0],
+                                          vectors[:, 2] - vectors[:, 0])
+            fh.write(records.tobytes())
+            written += len(records)
+            _report(progress, written / max(triangle_count, 1), "Writing STL")
+    if written != triangle_count:
+        raise ValueError(f"Expected {triangle_count} triangles, wrote {written}")
+    size = 84 + written * STL_RECORD_DTYPE.itemsize
+    count("bytes written", size)
+    return size
+
+
+IndexedMesh = namedtuple('IndexedMesh', ['vertices', 'faces'])
+
+MESH_MODES = ["adaptive", "uniform"]
+
+# Adaptive meshing: chord tolerance relative to the model size
+MESH_TOLERANCE = 1e-3
+INITIAL_MESH_STATIONS = 33
+MAX_MESH_STATIONS = 4096
+MIN_ANGULAR_SEGMENTS = 8
+MAX_ANGULAR_SEGMENTS = 1024
+
+
+def adaptive_stations(sample, a, b, tolerance, max_stations=MAX_MESH_STATIONS, progress=None):
+    """Refine x-stations until every profile curve is within tolerance of its chords
+    
+    sample maps an x array to an array of shape (curves, 2, len(x)) holding
+    (axial, radial) profile points. Each pass measures how far the curve
+    midpoints sit from the chords of all segments and splits the ones that
+    exceed the tolerance, so stations cluster where the profile bends.
+    Returns (x, points).
+    """
+    x = np.linspace(a, b, INITIAL_MESH_STATIONS)
+    points = sample(x)
+    while len(x) < max_stations:
+        midpoints = 0.5 * (x[:-1] + x[1:])
+        mid_points = sample(midpoints)
+        start = points[..., :-1]
+        chord = points[..., 1:] - start
+        offset = mid_points - start
+        length = np.hypot(chord[:, 0], chord[:, 1])
+        cross = np.abs(chord[:, 0] * offset[:, 1] - chord[:, 1] * offset[:, 0])
+        deviation = np.where(length > 0, cross / np.where(length > 0, length, 1),
+                             np.hypot(offset[:, 0], offset[:, 1]))
+        split = np.nonzero(deviation.max(axis=0) > tolerance)[0]
+        if len(split) == 0:
+            break
+        split = split[:max_stations - len(x)]
+        x = np.insert(x, split + 1, midpoints[split])
+        points = np.insert(points, split + 1, mid_points[..., split], axis=-1)
+        _report(progress, None, f"Meshing ({len(x):,} stations)")
+    return x, points
+
+
+def angular_segments(radius, tolerance):
+    """Segments per ring so the chord sagitta stays within tolerance
+    
+    Rings on the axis collapse to a single vertex.
+    """
+    ratio = np.clip(1 - tolerance / np.maximum(radius, tolerance), -1, 1)
+    segments = np.ceil(np.pi / np.maximum(np.arccos(ratio), 1e-12))
+    segments = np.clip(segments, MIN_ANGULAR_SEGMENTS, MAX_ANGULAR_SEGMENTS).astype(np.intp)
+    return np.where(radius > tolerance * 1e-6, segments, 1)
+
+
+@functools.lru_cache(maxsize=1024)
+def _zipper_pattern(count_a, count_b):
+    """Triangles joining a ring of count_a vertices to a ring of count_b vertices
+    
+    Local indices below count_a refer to ring A and the rest to ring B.
+    Edges of both rings are walked in angular order, and each step emits one
+    triangle that advances along whichever ring is behind.
+    """
+    times = np.concatenate(((np.arange(count_a) + 0.5) / count_a,
+                            (np.arange(count_b) + 0.5) / count_b))
+    is_a = np.concatenate((np.ones(count_a, bool), np.zeros(count_b, bool)))
+    order = np.lexsort((~is_a, times))
+    is_a = is_a[order]
+    step = np.concatenate((np.arange(count_a), np.arange(count_b)))[order]
+    a_before = np.cumsum(is_a) - is_a
+    b_before = np.cumsum(~is_a) - ~is_a
+    
+    pattern = np.empty((len(order), 3), dtype=np.intp)
+    pattern[is_a, 0] = step[is_a]
+    pattern[is_a, 1] = (step[is_a] + 1) % count_a
+    pattern[is_a, 2] = count_a + b_before[is_a] % count_b
+    pattern[~is_a, 0] = a_before[~is_a] % count_a
+    pattern[~is_a, 1] = count_a + (step[~is_a] + 1) % count_b
+    pattern[~is_a, 2] = count_a + step[~is_a]
+    return pattern
+
+
+def weld_vertices(vertices, faces, precision=1e-9):
+    """Merge coincident vertices, drop the triangles that collapse and any unused vertices"""
+    scale = max(float(np.abs(vertices).max(initial=0.0)), 1.0) * precision
+    keys = np.round(vertices / scale).astype(np.int64)
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    faces = inverse.reshape(-1)[faces]
+    keep = ((faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2])
+            & (faces[:, 0] != faces[:, 2]))
+    used, faces = np.unique(faces[keep], return_inverse=True)
+    return IndexedMesh(vertices[first][used], faces.reshape(-1, 3))
+
+
+def revolve_profile(axial, radial, axis, tolerance, progress=None, offset=0.0):
+    """Closed, indexed mesh of a closed (axial, radial) profile polygon revolved about the axis
+    
+    Every profile vertex becomes a ring of vertices sized by its radius, and
+    consecutive rings (including the closing edge) are stitched together, so
+    the surface is watertight with outward-facing triangles. The axis is
+    shifted to cross the other coordinate at offset.
+    """
+    # Walk the profile clockwise in the (axial, radial) plane so normals face outward
+    signed_area = np.sum(axial * np.roll(radial, -1) - np.roll(axial, -1) * radial)
+    if signed_area > 0:
+        axial, radial = axial[::-1], radial[::-1]
+    
+    counts = angular_segments(radial, tolerance)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ring = np.repeat(np.arange(len(counts)), counts)
+    theta = 2 * np.pi * (np.arange(counts.sum()) - offsets[ring]) / counts[ring]
+    along = axial[ring]
+    across = radial[ring] * np.cos(theta) + offset
+    depth = radial[ring] * np.sin(theta)
+    if axis == 'x':
+        vertices = np.stack((along, across, depth), axis=-1)
+    else:
+        # (y, x, -z) keeps the frame right-handed so the winding stays outward
+        vertices = np.stack((across, along, -depth), axis=-1)
+    
+    start = np.arange(len(counts))
+    end = np.roll(start, -1)
+    faces = []
+    pairs = np.stack((counts[start], counts[end]), axis=-1)
+    for count_a, count_b in np.unique(pairs, axis=0):
+        _report(progress, None, "Meshing")
+        edges = np.nonzero((pairs[:, 0] == count_a) & (pairs[:, 1] == count_b))[0]
+        pattern = _zipper_pattern(int(count_a), int(count_b))
+        offset_a = offsets[start[edges]][:, None, None]
+        offset_b = offsets[end[edges]][:, None, None]
+        faces.append(np.where(pattern < count_a, offset_a + pattern,
+                              offset_b + pattern - count_a).reshape(-1, 3))
+    return weld_vertices(vertices, np.concatenate(faces))
+
+
+def generate_indexed_mesh(funcs, revolve_index, a, b, axis, method, tolerance=MESH_TOLERANCE,
+                          progress=None, offset=0.0):
+    """Adaptive, watertight revolution mesh matching the volume integrand
+    
+    About the line y = offset the solid lies between the revolved function
+    and, with the washer method, an inner wall of radius sqrt(sum of squares)
+    of the other functions. About the line x = offset it is the shell region
+    between the revolved function and the sum of the others (washer) or y = 0
+    (disk), so [a, b] must not straddle the axis. Like compute_volume, [a, b]
+    is split where the two walls cross (see volume_crossings) and each piece
+    is meshed as its own closed shell, with the walls ordered on that piece;
+    neighbouring pieces touch along the circle where the walls meet.
+    tolerance is the allowed chord error relative to the model size.
+    """
+    others = [func for i, func in enumerate(funcs) if i != revolve_index]
+    hollow = method == 'washer' and len(others) > 0
+    if axis != 'x' and a < offset < b:
+        raise ValueError(f"The axis x = {offset:g} lies inside [a, b]; mesh each side separately")
+    # The walls differ in radius about y = offset and in height about x = offset
+    wall = 1 if axis == 'x' else 0
+    
+    def sample(x):
+        if axis == 'x':
+            outer = np.abs(evaluate_on_grid(funcs[revolve_index], x) - offset)
+            curves = [outer]
+            if hollow:
+                inner_sq = sum((evaluate_on_grid(func, x) - offset) ** 2 for func in others)
+                curves.append(np.sqrt(inner_sq))
+            radial = np.stack(curves)
+            axial = np.broadcast_to(x, radial.shape)
+        else:
+            # Shell region: top and bottom curves at radius |x - offset|
+            top = evaluate_on_grid(funcs[revolve_index], x)
+            bottom = sum((evaluate_on_grid(func, x) for func in others), np.zeros_like(x)) \
+                if hollow else np.zeros_like(x)
+            axial = np.stack((top, bottom))
+            radial = np.broadcast_to(np.abs(x - offset), axial.shape)
+        if not (np.all(np.isfinite(radial)) and np.all(np.isfinite(axial))):
+            raise ValueError("Functions are not finite on [a, b]")
+        points = np.stack((axial, radial), axis=1)
+        # The walls may trade places between pieces; the larger one comes first
+        points[:, wall] = np.sort(points[:, wall], axis=0)[::-1]
+        return points
+    
+    size = max(abs(b - a), float(np.abs(sample(np.linspace(a, b, INITIAL_MESH_STATIONS))).max()))
+    chord_tolerance = tolerance * size
+    crossings, _ = volume_crossings(funcs, revolve_index, a, b, axis, method, offset)
+    edges = [a, *crossings, b]
+    
+    vertices, faces, used = [], [], 0
+    for i, (lo, hi) in enumerate(zip(edges[:-1], edges[1:])):
+        x, points = adaptive_stations(sample, lo, hi, chord_tolerance, progress=progress)
+        # Close the piece exactly where the walls meet, so its end rings weld
+        if i > 0:
+            points[:, wall, 0] = points[:, wall, 0].mean()
+        if i < len(edges) - 2:
+            points[:, wall, -1] = points[:, wall, -1].mean()
+        piece = _revolve_piece(x, points, axis, hollow, chord_tolerance, progress, offset)
+        vertices.append(piece.vertices)
+        faces.append(piece.faces + used)
+        used += len(piece.vertices)
+    return IndexedMesh(np.concatenate(vertices), np.concatenate(faces))
+
+
+def _revolve_piece(x, points, axis, hollow, chord_tolerance, progress, offset):
+    """Revolve the profile of one piece sampled by generate_indexed_mesh"""
+    if axis != 'x':
+        # Top curve from a to b, down the x = b edge, back along the bottom curve
+        axial = np.concatenate((points[0, 0], points[1, 0][::-1]))
+        radial = np.concatenate((points[0, 1], points[1, 1][::-1]))
+        return revolve_profile(axial, radial, axis, chord_tolerance, progress, offset)
+    
+    # Outer curve from a to b, then back along the inner wall (or the axis)
+    outer_radius = points[0, 1]
+    inner_radius = points[1, 1] if hollow else np.zeros(2)
+    inner_axial = x if hollow else np.array([x[0], x[-1]])
+    axial = np.concatenate((x, inner_axial[::-1]))
+    radial = np.concatenate((outer_radius, inner_radius[::-1]))
+    return revolve_profile(axial, radial, axis, chord_tolerance, progress, offset)
+
+
+def iter_indexed_triangles(indexed_mesh, chunk_triangles=STREAM_CHUNK_TRIANGLES):
+    """Yield the triangles of an IndexedMesh as float32 arrays for write_binary_stl"""
+    vertices = indexed_mesh.vertices.astype(np.float32)
+    for start in range(0, len(indexed_mesh.faces), chunk_triangles):
+        yield vertices[indexed_mesh.faces[start:start + chunk_triangles]]
+
+
+def uniform_indexed_mesh(func, a, b, num_points, axis, offset=0.0):
+    """IndexedMesh of the uniform num_points x num_points revolution grid"""
+    u, radius = revolved_curve(func, np.linspace(a, b, num_points), axis, offset)
+    v = np.linspace(0, 2*np.pi, num_points)
+    vertices = revolution_vertices(radius, u, v, axis, offset).reshape(-1, 3)
+    return IndexedMesh(vertices, grid_faces(num_points, num_points))
+
+
+def revolution_mesh(funcs, revolve_index, a, b, axis, method, mesh_mode="adaptive",
+                    resolution=50, mesh_tolerance=MESH_TOLERANCE, progress=None, offset=0.0):
+    """IndexedMesh of the solid of revolution for the given mesh mode"""
+    if mesh_mode not in MESH_MODES:
+        raise ValueError(f"Unknown mesh mode: {mesh_mode}")
+    if mesh_mode == "uniform" and resolution < 2:
+        raise ValueError("Mesh resolution must be at least 2")
+    with span("mesh"):
+        if mesh_mode == "adaptive":
+            indexed_mesh = generate_indexed_mesh(funcs, revolve_index, a, b, axis, method,
+                                                 mesh_tolerance, progress, offset)
+        else:
+            indexed_mesh = uniform_indexed_mesh(funcs[revolve_index], a, b, resolution, axis,
+                                                offset)
+    count("triangles", len(indexed_mesh.faces))
+    return indexed_mesh
+
+
+def write_indexed_stl(filename, indexed_mesh, progress=None):
+    """Write an IndexedMesh to a binary STL file, returning the triangle count"""
+    write_binary_stl(filename, iter_indexed_triangles(indexed_mesh),
+                     len(indexed_mesh.faces), progress=progress)
+    return len(indexed_mesh.faces)
+
+
+# Mesh file formats, named by their file extensions
+MESH_FORMATS = ["stl", "3mf", "ply"]
+
+PLY_FACE_DTYPE = np.dtype([('count', 'u1'), ('indices', '<i4', (3,))])
+
+THREEMF_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" '
+    'ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>\n')
+THREEMF_RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" '
+    'Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>\n')
+THREEMF_MODEL_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<model unit="millimeter" xml:lang="en-US" '
+    'xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+    '<resources><object id="1" type="model"><mesh>\n<vertices>\n')
+THREEMF_MODEL_TAIL = ('</triangles>\n</mesh></object></resources>\n'
+                      '<build><item objectid="1"/></build>\n</model>\n')
+# Nine significant digits round-trip the float32 coordinates that STL stores
+THREEMF_VERTEX = '<vertex x="%.9g" y="%.9g" z="%.9g"/>\n'
+THREEMF_TRIANGLE = '<triangle v1="%d" v2="%d" v3="%d"/>\n'
+
+
+def mesh_format(filename, default=None):
+    """Mesh format implied by filename's extension, or default if it has no known one"""
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension in MESH_FORMATS:
+        return extension
+    if default is None:
+        raise ValueError(f"Unknown mesh format: {filename} (use .stl, .3mf or .ply)")
+    return default
+
+
+def write_indexed_ply(filename, indexed_mesh, progress=None):
+    """Write an IndexedMesh to a binary little-endian PLY file, returning the triangle count"""
+    vertices = np.ascontiguousarray(indexed_mesh.vertices, dtype='<f4')
+    faces = np.empty(len(indexed_mesh.faces), dtype=PLY_FACE_DTYPE)
+    faces['count'] = 3
+    faces['indices'] = indexed_mesh.faces
+    header = ("ply\nformat binary_little_endian 1.0\n"
+              f"element vertex {len(vertices)}\n"
+              "property float x\nproperty float y\nproperty float z\n"
+              f"element face {len(faces)}\n"
+              "property list uchar int vertex_indices\nend_header\n").encode('ascii')
+    with span("write PLY"), _removed_on_error(filename), open(filename, 'wb') as fh:
+        fh.write(header)
+        fh.write(vertices.tobytes())
+        _report(progress, 0.5, "Writing PLY")
+        fh.write(faces.tobytes())
+        _report(progress, 1.0, "Writing PLY")
+    count("bytes written", len(header) + vertices.nbytes + faces.nbytes)
+    return len(faces)
+
+
+def write_indexed_3mf(filename, indexed_mesh, progress=None, chunk=STREAM_CHUNK_TRIANGLES):
+    """Write an IndexedMesh to a 3MF package, returning the triangle count
+    
+    The model XML is compressed into the zip as it is generated, chunk
+    vertices or triangles at a time.
+    """
+    vertices, faces = indexed_mesh.vertices, indexed_mesh.faces
+    total = max(len(vertices) + len(faces), 1)
+    done = 0
+    with span("write 3MF"), _removed_on_error(filename), \
+            zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", THREEMF_CONTENT_TYPES)
+        package.writestr("_rels/.rels", THREEMF_RELATIONSHIPS)
+        with package.open("3D/3dmodel.model", 'w', force_zip64=True) as model:
+            model.write(THREEMF_MODEL_HEAD.encode('ascii'))
+            for rows, line, closing in ((vertices, THREEMF_VERTEX, '</vertices>\n<triangles>\n'),
+                                        (faces, THREEMF_TRIANGLE, '')):
+                for start in range(0, len(rows), chunk):
+                    block = rows[start:start + chunk].tolist()
+                    model.write(''.join(line % tuple(row) for row in block).encode('ascii'))
+                    done += len(block)
+                    _report(progress, done / total, "Writing 3MF")
+                model.write(closing.encode('ascii'))
+            model.write(THREEMF_MODEL_TAIL.encode('ascii'))
+    count("bytes written", os.path.getsize(filename))
+    return len(faces)
+
+
+MESH_WRITERS = {
+    "stl": write_indexed_stl,
+    "3mf": write_indexed_3mf,
+    "ply": write_indexed_ply,
+}
+
+
+def write_indexed_mesh(filename, indexed_mesh, progress=None, file_format=None):
+    """Write an IndexedMesh in file_format (by default, from the extension), returning the triangle count"""
+    return MESH_WRITERS[file_format or mesh_format(filename)](filename, indexed_mesh, progress)
+
+
+def write_revolution_mesh(filename, funcs, revolve_index, a, b, axis, method,
+                          mesh_mode="adaptive", resolution=50, mesh_tolerance=MESH_TOLERANCE,
+                          progress=None, offset=0.0, file_format=None):
+    """Mesh the solid of revolution and write it as STL, 3MF or PLY
+    
+    file_format defaults to the one implied by the extension (STL when there
+    is none). STL goes through write_revolution_stl, so large uniform meshes
+    are still streamed. Returns the number of triangles written.
+    """
+    file_format = file_format or mesh_format(filename, "stl")
+    if file_format == "stl":
+        return write_revolution_stl(filename, funcs, revolve_index, a, b, axis, method,
+                                    mesh_mode, resolution, mesh_tolerance, progress, offset)
+    if file_format not in MESH_WRITERS:
+        raise ValueError(f"Unknown mesh format: {file_format}")
+    indexed_mesh = revolution_mesh(funcs, revolve_index, a, b, axis, method, mesh_mode,
+                                   resolution, mesh_tolerance, progress, offset)
+    return MESH_WRITERS[file_format](filename, indexed_mesh, progress)
+
+
+def write_revolution_stl(filename, funcs, revolve_index, a, b, axis, method,
+                         mesh_mode="adaptive", resolution=50, mesh_tolerance=MESH_TOLERANCE,
+                         progress=None, offset=0.0):
+    """Mesh the solid of revolution and stream it to a binary STL file
+    
+    Returns the number of triangles written.
+    """
+    if mesh_mode not in MESH_MODES:
+        raise ValueError(f"Unknown mesh mode: {mesh_mode}")
+    if mesh_mode == "adaptive":
+        return write_indexed_stl(filename, revolution_mesh(
+            funcs, revolve_index, a, b, axis, method, mesh_mode, resolution,
+            mesh_tolerance, progress, offset), progress)
+    
+    if resolution < 2:
+        raise ValueError("Mesh resolution must be at least 2")
+    # Meshing and writing are interleaved, so both count as writing here
+    triangle_count = revolution_triangle_count(resolution)
+    triangles = iter_revolution_triangles(funcs[revolve_index], a, b, resolution, axis,
+                                          offset=offset)
+    write_binary_stl(filename, triangles, triangle_count, progress=progress)
+    count("triangles", triangle_count)
+    return triangle_count
+
+
+def build_stl_mesh(funcs, revolve_index, a, b, axis, num_points=50, offset=0.0):
+    """numpy-stl Mesh of the uniform num_points x num_points revolution grid"""
+    if not STL_AVAILABLE:
+        raise RuntimeError("numpy-stl library not available. Please install it with: pip install numpy-stl")
+    from stl import mesh
+    
+    with span("mesh"):
+        # Create vertices for the revolution
+        u, radius = revolved_curve(funcs[revolve_index], np.linspace(a, b, num_points),
+                                   axis, offset)  # positions along the axis, radii
+        v = np.linspace(0, 2*np.pi, num_points)  # theta values
+        vertices = revolution_vertices(radius, u, v, axis, offset)
+        vertices = vertices.reshape(-1, 3).astype(np.float32)
+        
+        # Create faces (simplified triangulation)
+        faces = grid_faces(num_points, num_points)
+        
+        # Create the mesh, gathering triangle corners straight into its buffer
+        data = np.zeros(len(faces), dtype=mesh.Mesh.dtype)
+        np.take(vertices, faces, axis=0, out=data['vectors'])
+    count("triangles", len(faces))
+    return mesh.Mesh(data)
+
+
+def parse_functions(func_strs):
+    """Compile the non-blank expression strings, checking each one evaluates"""
+    funcs = []
+    with span("parse"):
+        for func_str in func_strs:
+            if func_str.strip():
+                try:
+                    func = compile_expression(func_str)
+                    # Test the function
+                    func(1.0)
+                except Exception as e:
+                    raise ValueError(f"Invalid function: {func_str}\nError: {e}") from e
+                funcs.append(func)
+    return funcs
+
+
+AXES = ["x", "y"]
+METHODS = ["disk", "washer"]
+
+VolumeJob = namedtuple('VolumeJob', [
+    'name', 'functions', 'revolve_index', 'a', 'b', 'dx', 'axis', 'method',
+    'integrator', 'tolerance', 'stl', 'mesh', 'resolution', 'mesh_tolerance', 'offset',
+    'format',
+], defaults=("job", (), 0, 0.0, 2.0, 0.01, "x", "washer", "riemann", 1e-9,
+             None, "adaptive", 50, MESH_TOLERANCE, 0.0, "stl"))
+
+def _mesh_file(value):
+    """A job's stl value: None for no mesh, "true" for the default name, or a filename"""
+    text = str(value).strip()
+    if text.lower() in ("0", "false", "no"):
+        return None
+    if text.lower() in ("1", "true", "yes"):
+        return "true"
+    return text
+
+
+_JOB_CONVERTERS = {
+    'a': float, 'b': float, 'dx': float, 'tolerance': float, 'mesh_tolerance': float,
+    'offset': float,
+    'revolve_index': int, 'resolution': int,
+    'stl': _mesh_file,
+}
+
+
+def job_from_spec(spec, index=0):
+    """Build a VolumeJob from a job spec dict (a JSON object or a CSV row)
+    
+    Functions come from a "functions" list (or a ';'-separated string) or
+    from f1/f2/f3 entries. Blank values fall back to the defaults.
+    """
+    spec = {key: value for key, value in spec.items() if value not in (None, "")}
+    unknown = set(spec) - set(VolumeJob._fields) - {"f1", "f2", "f3"}
+    if unknown:
+        raise ValueError(f"Unknown job field(s): {', '.join(sorted(unknown))}")
+    
+    functions = spec.pop("functions", None)
+    if functions is None:
+        functions = [spec.pop(key, "") for key in ("f1", "f2", "f3")]
+    elif isinstance(functions, str):
+        functions = functions.split(";")
+    for key in ("f1", "f2", "f3"):
+        spec.pop(key, None)
+    functions = tuple(func_str for func_str in functions if str(func_str).strip())
+    if not functions:
+        raise ValueError("Job has no functions")
+    
+    values = {key: _JOB_CONVERTERS.get(key, str)(value) for key, value in spec.items()}
+    values.setdefault("name", f"job{index + 1}")
+    job = VolumeJob(functions=functions, **values)
+    
+    if job.axis not in AXES:
+        raise ValueError(f"Unknown axis: {job.axis}")
+    if job.method not in METHODS:
+        raise ValueError(f"Unknown method: {job.method}")
+    if job.integrator not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator: {job.integrator}")
+    if job.mesh not in MESH_MODES:
+        raise ValueError(f"Unknown mesh mode: {job.mesh}")
+    if job.format not in MESH_FORMATS:
+        raise ValueError(f"Unknown mesh format: {job.format}")
+    if not 0 <= job.revolve_index < len(functions):
+        raise ValueError("Selected function is not defined")
+    return job
+
+
+def job_mesh_filename(job, output_dir="."):
+    """Path of a job's mesh file, or None when the job writes no mesh
+    
+    That is the file named by job.stl, or <name>.<format> when job.stl is
+    just true.
+    """
+    if not job.stl:
+        return None
+    filename = f"{job.name}.{job.format}" if job.stl == "true" else job.stl
+    return os.path.join(output_dir, filename)
+
+
+def run_job(job, output_dir=".", cache=None):
+    """Compute a job's volume (and write its mesh if requested), returning a result dict
+    
+    The mesh goes to the file named by job.stl, or to <name>.<format> when
+    job.stl is just true; the extension of a given name picks the format.
+    cache is an optional volume_cache.ResultCache to reuse earlier results.
+    """
+    volume = cache.compute_volume if cache is not None else compute_volume
+    write_mesh = cache.write_revolution_mesh if cache is not None else write_revolution_mesh
+    funcs = parse_functions(job.functions)
+    result = volume(funcs, job.revolve_index, job.a, job.b, job.dx, job.axis,
+                    job.method, job.integrator, job.tolerance, offset=job.offset)
+    record = {
+        "name": job.name,
+        "volume": result.volume,
+        "error": result.error,
+        "evaluations": result.evaluations,
+        "integrator": result.integrator,
+        "crossings": list(result.crossings),
+        "stl": None,
+        "triangles": None,
+    }
+    filename = job_mesh_filename(job, output_dir)
+    if filename is not None:
+        record["triangles"] = write_mesh(
+            filename, funcs, job.revolve_index, job.a, job.b, job.axis, job.method,
+            job.mesh, job.resolution, job.mesh_tolerance, offset=job.offset,
+            file_format=mesh_format(filename, job.format))
+        record["stl"] = filename
+    return record
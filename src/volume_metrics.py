@@ -0,0 +1,144 @@
+"""
+Volume of Revolution Calculator - instrumentation
+
+Lightweight span timers and counters for the hot paths. A Recorder is made
+active for the current thread with recording(); span() and count() calls in
+the engine then add to it, and cost next to nothing when no recorder is
+active. Stage names used by the engine and GUI:
+
+    spans:    parse, intersections, integrate, mesh, write STL/3MF/PLY, plot, render
+    counters: evaluations, samples, triangles, bytes written, cache hits
+
+profiled() wraps a function so each call is run under cProfile and dumped to
+a .prof file (for snakeviz/pstats) plus a plain-text summary.
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+import datetime
+import threading
+import contextlib
+from collections import OrderedDict
+
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), "volume-calculator-profiles")
+PROFILE_SUMMARY_LINES = 40
+
+_local = threading.local()
+
+
+class Recorder:
+    """Accumulated span durations and counters for one computation
+
+    A recorder may be active on several threads at once (a worker and the Tk
+    main thread), so updates are locked.
+    """
+
+    def __init__(self):
+        self.spans = OrderedDict()
+        self.counters = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add_span(self, name, seconds):
+        with self.lock:
+            total, calls = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (total + seconds, calls + 1)
+
+    def add_count(self, name, amount):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """Short one-line form, e.g. for a status bar"""
+        with self.lock:
+            parts = [f"{name} {total * 1000:.0f} ms" for name, (total, _) in self.spans.items()]
+            parts += [f"{amount:,} {name}" for name, amount in self.counters.items()]
+        return ", ".join(parts)
+
+    def format_lines(self):
+        """Per-stage breakdown, one line per span and counter"""
+        with self.lock:
+            lines = [f"{name:<14} {total * 1000:10.1f} ms" + (f"  ({calls} calls)" if calls > 1 else "")
+                     for name, (total, calls) in self.spans.items()]
+            lines += [f"{name:<14} {amount:>13,}" for name, amount in self.counters.items()]
+        return lines
+
+
+def active_recorder():
+    return getattr(_local, "recorder", None)
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """Make recorder the active recorder of this thread for the block"""
+    previous = active_recorder()
+    _local.recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _local.recorder = previous
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the block and add it to the active recorder under name"""
+    recorder = active_recorder()
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add_span(name, time.perf_counter() - start)
+
+
+def count(name, amount=1):
+    """Add amount to the active recorder's counter name"""
+    recorder = active_recorder()
+    if recorder is not None:
+        recorder.add_count(name, amount)
+
+
+# cProfile allows one active profiler per process on Python 3.12+
+_profile_lock = threading.Lock()
+
+
+def _dump_profile(profile, directory, label):
+    """Write a profile's .prof file and .txt summary, returning the .prof path"""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = os.path.join(directory, f"{label}-{stamp}.prof")
+    profile.dump_stats(path)
+    text = io.StringIO()
+    pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+    with open(path[:-len(".prof")] + ".txt", "w") as fh:
+        fh.write(text.getvalue())
+    return path
+
+
+def profiled(func, label="profile", directory=None):
+    """Wrap func so every call is profiled and dumped to directory
+
+    Writes <label>-<timestamp>.prof and a .txt summary sorted by cumulative
+    time; the .prof path of the last call is kept in wrapper.last_profile.
+    Profiled calls run one at a time, and a failed dump never replaces the
+    call's result or exception.
+    """
+    directory = directory or PROFILE_DIR
+
+    def wrapper(*args, **kwargs):
+        with _profile_lock:
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                try:
+                    wrapper.last_profile = _dump_profile(profile, directory, label)
+                except Exception:
+                    wrapper.last_profile = None
+
+    wrapper.last_profile = None
+    return wrapper
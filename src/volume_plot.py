@@ -0,0 +1,233 @@
+"""
+Volume of Revolution Calculator - embedded plot panel
+
+A single matplotlib figure lives inside the main window for the whole
+session. Each render updates the existing surface, line and curve artists in
+place instead of creating a new pyplot figure, so redraws stay fast and
+memory stays flat.
+"""
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import LightSource, to_rgba
+from mpl_toolkits.mplot3d import art3d
+
+from volume_engine import evaluate_on_grid
+from volume_metrics import span
+
+SURFACE_POINTS = 50
+CURVE_POINTS = 200
+
+COLORS = ['blue', 'red', 'green']
+LABELS = ['f₁(x)', 'f₂(x)', 'f₃(x)']
+
+
+def surface_polygons(X, Y, Z):
+    """Quads of shape (n, 4, 3) covering a gridded surface"""
+    points = np.stack((X, Y, Z), axis=-1)
+    quads = np.stack((points[:-1, :-1], points[:-1, 1:], points[1:, 1:], points[1:, :-1]), axis=2)
+    return quads.reshape(-1, 4, 3)
+
+
+class PlotPanel:
+    """Persistent 3D revolution and 2D curve plots embedded in a Tk container"""
+
+    def __init__(self, parent):
+        self.figure = Figure(figsize=(10, 4.5))
+        self.ax3d = self.figure.add_subplot(121, projection='3d')
+        self.ax2d = self.figure.add_subplot(122)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+        self.light = LightSource(azdeg=225, altdeg=19.4712)
+
+        # Artist pools reused across renders
+        self.surfaces = []
+        self.lines3d = []
+        self.curves = []
+        self.fill = None
+        self.axis_line = None
+
+        self.ax3d.set_xlabel('X')
+        self.ax3d.set_ylabel('Y')
+        self.ax3d.set_zlabel('Z')
+        self.ax2d.set_xlabel('x')
+        self.ax2d.set_ylabel('y')
+        self.ax2d.set_title('2D Area Between Curves')
+        self.ax2d.grid(True, alpha=0.3)
+        self.laid_out = False
+
+    def _shaded_colors(self, polygons, color, alpha):
+        """Per-face colors lit like plot_surface's default shading"""
+        normals = np.cross(polygons[:, 2] - polygons[:, 0], polygons[:, 3] - polygons[:, 1])
+        length = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals = np.divide(normals, length, out=np.zeros_like(normals), where=length > 0)
+        shade = self.light.shade_normals(normals, fraction=1.0)
+        colors = np.tile(to_rgba(color, alpha), (len(polygons), 1))
+        colors[:, :3] *= (0.3 + 0.7 * np.nan_to_num(shade, nan=1.0))[:, None]
+        return colors
+
+    def _set_surfaces(self, surfaces):
+        """Show (X, Y, Z, color, alpha) surfaces, reusing existing collections"""
+        for i, (X, Y, Z, color, alpha) in enumerate(surfaces):
+            polygons = surface_polygons(X, Y, Z)
+            colors = self._shaded_colors(polygons, color, alpha)
+            if i < len(self.surfaces):
+                collection = self.surfaces[i]
+                collection.set_verts(polygons)
+                collection.set_facecolor(colors)
+                collection.set_visible(True)
+            else:
+                collection = art3d.Poly3DCollection(polygons, facecolors=colors,
+                                                    edgecolors='none', linewidths=0)
+                self.ax3d.add_collection3d(collection)
+                self.surfaces.append(collection)
+        for collection in self.surfaces[len(surfaces):]:
+            collection.set_visible(False)
+
+    def _set_lines3d(self, lines):
+        """Show (x, y, z, style) 3D lines, reusing existing Line3D artists"""
+        for i, (x, y, z, style) in enumerate(lines):
+            if i < len(self.lines3d):
+                line = self.lines3d[i]
+            else:
+                line, = self.ax3d.plot([], [], [])
+                self.lines3d.append(line)
+            line.set_data_3d(x, y, z)
+            line.set(visible=True, **style)
+        for line in self.lines3d[len(lines):]:
+            line.set_visible(False)
+
+    def _set_limits3d(self, surfaces, lines):
+        points = [np.stack((X.ravel(), Y.ravel(), Z.ravel())) for X, Y, Z, _, _ in surfaces]
+        points += [np.stack((np.ravel(x), np.ravel(y), np.ravel(z))) for x, y, z, _ in lines]
+        if not points:
+            return
+        points = np.concatenate(points, axis=1)
+        points = points[:, np.all(np.isfinite(points), axis=0)]
+        if points.size == 0:
+            return
+        low, high = points.min(axis=1), points.max(axis=1)
+        pad = np.maximum((high - low) * 0.05, 1e-9)
+        self.ax3d.set_xlim(low[0] - pad[0], high[0] + pad[0])
+        self.ax3d.set_ylim(low[1] - pad[1], high[1] + pad[1])
+        self.ax3d.set_zlim(low[2] - pad[2], high[2] + pad[2])
+
+    def update(self, funcs, revolve_index, a, b, axis, method, cross_sections,
+               points=SURFACE_POINTS, curves=None, offset=0.0):
+        """Redraw both plots for new inputs, updating artists in place
+
+        points sets the surface grid density; live previews draw a coarser
+        grid first and refine it once the full result is in. curves may hold
+        precomputed (x, samples) for the 2D plot, one row per function. offset
+        places the axis at y = offset (x-axis) or x = offset (y-axis). The
+        canvas is drawn right away so its cost shows up as the render span.
+        """
+        with span("plot"):
+            self._update_artists(funcs, revolve_index, a, b, axis, method, cross_sections,
+                                 points, curves, offset)
+        with span("render"):
+            self.canvas.draw()
+
+    def _update_artists(self, funcs, revolve_index, a, b, axis, method, cross_sections,
+                        points, curves, offset=0.0):
+        """Point the surface, line and curve artists at the new data"""
+        revolve_func = funcs[revolve_index]
+        others = [func for i, func in enumerate(funcs) if i != revolve_index]
+        surfaces = []
+        lines = []
+        cross_style = dict(color='k', linestyle='-', linewidth=2, alpha=0.8)
+        x = np.linspace(a, b, points)
+        theta = np.linspace(0, 2*np.pi, points)
+        X, T = np.meshgrid(x, theta)
+
+        if axis == 'x':
+            R_outer = evaluate_on_grid(revolve_func, x)[None, :] - offset
+            surfaces.append((X, offset + R_outer * np.cos(T), R_outer * np.sin(T), 'blue', 0.7))
+
+            if method == 'washer':
+                for func in others:
+                    R_inner = evaluate_on_grid(func, x)[None, :] - offset
+                    surfaces.append((X, offset + R_inner * np.cos(T), R_inner * np.sin(T),
+                                     'red', 0.5))
+
+            # Add cross-sections at specific theta values if enabled
+            if cross_sections:
+                x_cross = np.linspace(a, b, 30)
+                r_cross = evaluate_on_grid(revolve_func, x_cross) - offset
+                for theta_val in [0, np.pi/2, np.pi, 3*np.pi/2]:
+                    lines.append((x_cross, offset + r_cross * np.cos(theta_val),
+                                  r_cross * np.sin(theta_val), cross_style))
+
+            axis_name = f'y = {offset:g}' if offset else 'X-axis'
+            self.ax3d.set_title(f'3D Revolution around {axis_name}\n({method.title()} Method)')
+        else:
+            # Shells: each x sweeps a circle of radius |x - offset| at height f(x)
+            R = (x - offset)[None, :]
+            heights = [(evaluate_on_grid(revolve_func, x), 'blue', 0.7)]
+            if method == 'washer' and others:
+                heights.append((sum(evaluate_on_grid(func, x) for func in others), 'red', 0.5))
+            for height, color, alpha in heights:
+                surfaces.append((offset + R * np.cos(T), np.broadcast_to(height, X.shape),
+                                 R * np.sin(T), color, alpha))
+
+            # Add cross-sections at specific x values if enabled
+            if cross_sections:
+                theta_circle = np.linspace(0, 2*np.pi, 30)
+                x_vals = np.linspace(a, b, 5)
+                for x_val, height in zip(x_vals, evaluate_on_grid(revolve_func, x_vals)):
+                    radius = abs(x_val - offset)
+                    lines.append((offset + radius * np.cos(theta_circle),
+                                  np.full_like(theta_circle, height),
+                                  radius * np.sin(theta_circle), cross_style))
+
+            axis_name = f'x = {offset:g}' if offset else 'Y-axis'
+            self.ax3d.set_title(f'3D Revolution around {axis_name}\n(Shell Method)')
+
+        self._set_surfaces(surfaces)
+        self._set_lines3d(lines)
+        self._set_limits3d(surfaces, lines)
+        self._update_curves(funcs, revolve_index, a, b, curves)
+        self._update_axis_line(axis, offset)
+        if not self.laid_out:
+            # Layout once titles and labels exist; later renders keep it
+            self.figure.tight_layout()
+            self.laid_out = True
+
+    def _update_curves(self, funcs, revolve_index, a, b, curves=None):
+        """Update the 2D curves and the shaded area under the revolved function"""
+        if curves is None:
+            x_vals = np.linspace(a, b, CURVE_POINTS)
+            samples = [evaluate_on_grid(func, x_vals) for func in funcs]
+        else:
+            x_vals, samples = curves
+        while len(self.curves) < len(funcs):
+            i = len(self.curves)
+            line, = self.ax2d.plot([], [], color=COLORS[i], linewidth=2, label=LABELS[i])
+            self.curves.append(line)
+
+        if self.fill is not None:
+            self.fill.remove()
+            self.fill = None
+        for i, line in enumerate(self.curves):
+            line.set_visible(i < len(funcs))
+            if i >= len(funcs):
+                continue
+            y_vals = samples[i]
+            line.set_data(x_vals, y_vals)
+            if i == revolve_index:
+                self.fill = self.ax2d.fill_between(x_vals, y_vals, alpha=0.3, color=COLORS[i])
+
+        self.ax2d.relim(visible_only=True)
+        self.ax2d.update_datalim([[a, 0], [b, 0]])
+        self.ax2d.autoscale_view()
+        self.ax2d.legend(handles=self.curves[:len(funcs)])
+
+    def _update_axis_line(self, axis, offset):
+        """Dashed line in the 2D plot marking an offset axis of revolution"""
+        if self.axis_line is not None:
+            self.axis_line.remove()
+            self.axis_line = None
+        if offset:
+            draw = self.ax2d.axhline if axis == 'x' else self.ax2d.axvline
+            self.axis_line = draw(offset, color='k', linestyle='--', linewidth=1, alpha=0.7)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Volume of Revolution Calculator - print queue
+
+Meshes jobs in a process pool and uploads the finished files to an
+OctoPrint-compatible printer (POST /api/files/local with an X-Api-Key
+header). The queue runs an asyncio event loop on a background thread, so
+submit() can be called from any thread (such as the Tk main loop); status
+changes are handed back through a thread-safe queue of JobStatus tuples.
+
+    python volume_printing.py jobs.json --printer http://octopi.local --api-key KEY
+
+Jobs are volume_engine jobs; their meshes are written in the job's format,
+except that uploads are always STL, the only mesh format OctoPrint accepts.
+Printing is left to the printer, once the STL has been sliced into G-code.
+tools/octoprint_stub.py stands in for a printer during development.
+"""
+
+import os
+import sys
+import json
+import uuid
+import queue
+import shutil
+import asyncio
+import argparse
+import tempfile
+import itertools
+import threading
+import http.client
+import urllib.parse
+import concurrent.futures
+from collections import namedtuple, OrderedDict
+
+from volume_engine import (job_from_spec, job_mesh_filename, mesh_format, parse_functions,
+                           write_revolution_mesh)
+from volume_cache import DEFAULT_CACHE_DIR, ResultCache
+from volume_cli import load_job_specs
+
+# Uploads in flight at once (and pooled connections per printer)
+MAX_UPLOADS = 2
+UPLOAD_CHUNK_BYTES = 256 * 1024
+HTTP_TIMEOUT = 60
+# OctoPrint stores uploaded meshes only as STL
+UPLOAD_FORMAT = "stl"
+
+# Job states, in order; a job ends in DONE, FAILED or CANCELLED
+QUEUED = "queued"
+MESHING = "meshing"
+UPLOADING = "uploading"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (DONE, FAILED, CANCELLED)
+
+JobStatus = namedtuple('JobStatus', ['id', 'name', 'state', 'message', 'filename'],
+                       defaults=("", None))
+
+
+class PrinterError(Exception):
+    """Raised when the printer cannot be reached or rejects a request"""
+
+
+class OctoPrintClient:
+    """Minimal client for the OctoPrint REST API with pooled keep-alive connections
+
+    Requests block, and may be made from several threads at once; at most
+    max_connections are open at a time and idle ones are reused.
+    """
+
+    def __init__(self, url, api_key, max_connections=MAX_UPLOADS, timeout=HTTP_TIMEOUT):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid printer URL: {url}")
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+    def _connect(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request and return its decoded JSON reply
+
+        body may be bytes or a function returning an iterable of bytes, which
+        is called again if a reused connection turns out to be stale.
+        """
+        headers = dict(headers or {}, **{"X-Api-Key": self.api_key})
+        with self.slots:
+            for attempt in range(2):
+                try:
+                    conn, reused = self.idle.get_nowait(), True
+                except queue.Empty:
+                    conn, reused = self._connect(), False
+                try:
+                    conn.request(method, self.prefix + path,
+                                 body=body() if callable(body) else body, headers=headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                    break
+                except (OSError, http.client.HTTPException) as e:
+                    conn.close()
+                    # The printer may have closed an idle connection; retry once on a new one
+                    if not reused or attempt:
+                        raise PrinterError(f"{method} {path} failed: {e}") from e
+            if response.will_close:
+                conn.close()
+            else:
+                self.idle.put(conn)
+        if response.status >= 400:
+            raise PrinterError(f"{method} {path}: HTTP {response.status} "
+                               f"{data[:200].decode('utf-8', 'replace').strip()}")
+        return json.loads(data) if data else {}
+
+    def upload(self, path, name=None, select=False, start=False, progress=None):
+        """Stream a file to the printer's local storage (POST /api/files/local)
+
+        start also selects the file and starts printing it, which OctoPrint
+        only does for G-code files. progress(fraction)
+        is called as the file is sent.
+        """
+        name = name or os.path.basename(path)
+        boundary = uuid.uuid4().hex
+        fields = [("select", "true" if select or start else "false"),
+                  ("print", "true" if start else "false")]
+        head = "".join(f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n'
+                       f'{value}\r\n' for key, value in fields)
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+                 f'filename="{name}"\r\nContent-Type: application/octet-stream\r\n\r\n')
+        head = head.encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+        size = os.path.getsize(path)
+
+        def body():
+            yield head
+            sent = 0
+            with open(path, "rb") as fh:
+                while True:
+                    chunk = fh.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    yield chunk
+                    sent += len(chunk)
+                    if progress is not None:
+                        progress(sent / max(size, 1))
+            yield tail
+
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}",
+                   "Content-Length": str(len(head) + size + len(tail))}
+        return self.request("POST", "/api/files/local", body, headers)
+
+    def job_state(self):
+        """The printer's current job and progress (GET /api/job)"""
+        return self.request("GET", "/api/job")
+
+
+# Result cache of each mesh worker process, by cache directory
+_worker_caches = {}
+
+
+def mesh_job(job, filename, cache_dir=DEFAULT_CACHE_DIR):
+    """Process-pool entry point: write a job's mesh, returning its triangle count
+    
+    Only the mesh is made (the volume is not integrated), through a result
+    cache in cache_dir that is shared with other processes using it; None
+    disables the cache.
+    """
+    if cache_dir is None:
+        write_mesh = write_revolution_mesh
+    else:
+        if cache_dir not in _worker_caches:
+            _worker_caches[cache_dir] = ResultCache(cache_dir)
+        write_mesh = _worker_caches[cache_dir].write_revolution_mesh
+    return write_mesh(filename, parse_functions(job.functions), job.revolve_index, job.a, job.b,
+                      job.axis, job.method, job.mesh, job.resolution, job.mesh_tolerance,
+                      offset=job.offset, file_format=mesh_format(filename, job.format))
+
+
+class PrintQueue:
+    """Mesh jobs in a process pool and send them to a printer, in the background
+
+    Every status change is recorded in statuses and put on events, which a
+    GUI can drain from its own event loop without blocking. Meshes go through
+    the result cache in cache_dir (None disables it), so sending a model again
+    does not remesh it. Jobs that do not name their mesh file write
+    <name>-<job id>.<format>, so files of different jobs never clash.
+    Without an output_dir the files go to a temporary directory that close()
+    removes.
+    """
+
+    def __init__(self, client=None, output_dir=None, workers=None, max_uploads=MAX_UPLOADS,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        self.client = client
+        self.temporary_output = output_dir is None
+        self.output_dir = output_dir or tempfile.mkdtemp(prefix="volume-print-")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_uploads = max_uploads
+        self.events = queue.Queue()
+        self.statuses = OrderedDict()
+        self.cancelled = set()
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.jobs = asyncio.Queue()
+        self.uploads = asyncio.Semaphore(self.max_uploads)
+        self.consumers = [self.loop.create_task(self._consume()) for _ in range(self.workers)]
+        ready.set()
+        self.loop.run_forever()
+
+    def _set(self, job_id, name, state, message="", filename=None):
+        status = JobStatus(job_id, name, state, message, filename)
+        # The event is queued before the status changes, so once pending()
+        # reaches zero every event is already on the queue to be drained
+        with self.lock:
+            self.events.put(status)
+            self.statuses[job_id] = status
+
+    def submit(self, job, send=True):
+        """Queue a VolumeJob, returning its id
+
+        The job's mesh is written to output_dir; with send it is written as
+        STL whatever the job's format and then uploaded to the printer.
+        """
+        if send:
+            if self.client is None:
+                raise ValueError("No printer is configured")
+            if job.stl not in (None, "true") and mesh_format(job.stl, "stl") != UPLOAD_FORMAT:
+                raise ValueError(f"{job.name}: printers only accept STL uploads, not {job.stl}")
+            job = job._replace(format=UPLOAD_FORMAT)
+        job_id = next(self.ids)
+        self._set(job_id, job.name, QUEUED, "Waiting for a worker")
+        self.loop.call_soon_threadsafe(self.jobs.put_nowait, (job_id, job, send))
+        return job_id
+
+    def cancel(self, job_id):
+        """Stop a job before its next stage (running meshes and uploads finish first)"""
+        with self.lock:
+            self.cancelled.add(job_id)
+
+    def pending(self):
+        """Number of submitted jobs that have not finished yet"""
+        with self.lock:
+            return sum(status.state not in FINAL_STATES for status in self.statuses.values())
+
+    def join(self, timeout=None):
+        """Wait until every submitted job has finished"""
+        asyncio.run_coroutine_threadsafe(self.jobs.join(), self.loop).result(timeout)
+
+    def close(self):
+        """Stop the event loop and the worker processes; unfinished jobs are dropped
+
+        A temporary output directory is removed with the files in it.
+        """
+        asyncio.run_coroutine_threadsafe(self._stop_consumers(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        if self.temporary_output:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    async def _stop_consumers(self):
+        for task in self.consumers:
+            task.cancel()
+        await asyncio.gather(*self.consumers, return_exceptions=True)
+
+    async def _consume(self):
+        while True:
+            job_id, job, send = await self.jobs.get()
+            try:
+                await self._process(job_id, job, send)
+            finally:
+                self.jobs.task_done()
+
+    def _check_cancelled(self, job_id, name, filename=None):
+        with self.lock:
+            cancelled = job_id in self.cancelled
+        if cancelled:
+            self._set(job_id, name, CANCELLED, "Cancelled", filename)
+        return cancelled
+
+    async def _process(self, job_id, job, send):
+        loop = asyncio.get_event_loop()
+        filename = None
+        try:
+            if self._check_cancelled(job_id, job.name):
+                return
+            if job.stl in (None, "true"):
+                path = os.path.join(self.output_dir, f"{job.name}-{job_id}.{job.format}")
+            else:
+                path = job_mesh_filename(job, self.output_dir)
+            self._set(job_id, job.name, MESHING, "Generating mesh")
+            triangles = await loop.run_in_executor(self.pool, mesh_job, job, path,
+                                                   self.cache_dir)
+            filename = path
+            if not send:
+                self._set(job_id, job.name, DONE, f"{triangles:,} triangles", filename)
+                return
+            if self._check_cancelled(job_id, job.name, filename):
+                return
+
+            def progress(fraction):
+                self._set(job_id, job.name, UPLOADING, f"Uploading {fraction:.0%}", filename)
+
+            # The semaphore bounds uploads; the client's pool bounds connections
+            async with self.uploads:
+                self._set(job_id, job.name, UPLOADING, "Uploading", filename)
+                await loop.run_in_executor(None, self.client.upload, filename, None, False,
+                                           False, progress)
+            self._set(job_id, job.name, DONE, "Uploaded", filename)
+        except Exception as e:
+            self._set(job_id, job.name, FAILED, str(e), filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesh jobs and send them to an OctoPrint printer")
+    parser.add_argument("jobs", help="JSON or CSV file of job specs")
+    parser.add_argument("--printer", help="printer URL, e.g. http://octopi.local (omit to only mesh)")
+    parser.add_argument("--api-key", default=os.environ.get("OCTOPRINT_API_KEY", ""),
+                        help="OctoPrint API key (default: $OCTOPRINT_API_KEY)")
+    parser.add_argument("--output-dir", "-d", default=".", help="directory for mesh files")
+    parser.add_argument("--workers", "-j", type=int, default=None,
+                        help="mesh worker processes (default: CPU count)")
+    parser.add_argument("--max-uploads", type=int, default=MAX_UPLOADS,
+                        help=f"concurrent uploads (default {MAX_UPLOADS})")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="directory of cached meshes reused across runs")
+    parser.add_argument("--no-cache", action="store_true", help="always remesh")
+    args = parser.parse_args(argv)
+
+    jobs = [job_from_spec(spec, index) for index, spec in enumerate(load_job_specs(args.jobs))]
+    os.makedirs(args.output_dir, exist_ok=True)
+    client = OctoPrintClient(args.printer, args.api_key, args.max_uploads) if args.printer else None
+    print_queue = PrintQueue(client, args.output_dir, args.workers, args.max_uploads,
+                             None if args.no_cache else args.cache_dir)
+    try:
+        for job in jobs:
+            print_queue.submit(job, send=client is not None)
+        print_queue.join()
+    finally:
+        print_queue.close()
+
+    # Report the final state of every job
+    for status in print_queue.statuses.values():
+        print(f"{status.name}: {status.state} {status.message} {status.filename or ''}".rstrip())
+    return 0 if all(status.state == DONE for status in print_queue.statuses.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
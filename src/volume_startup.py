@@ -0,0 +1,106 @@
+"""
+Volume of Revolution Calculator - startup report
+
+Times every module import (like python -X importtime) and the startup phases
+of the GUI, so slow cold starts can be caught before they ship:
+
+    python volume_calculator_gui.py --startup-report
+    python volume_calculator_gui.py --startup-report=startup.json
+
+Imports are timed by wrapping builtins.__import__, which also catches the
+modules the GUI loads lazily after the window is shown.
+"""
+
+import sys
+import json
+import time
+import builtins
+import threading
+from collections import namedtuple
+
+# One actually executed import: cumulative and self time in seconds, nesting
+# depth, and the startup phase it happened in
+ImportRecord = namedtuple('ImportRecord', ['name', 'cumulative', 'self', 'depth', 'phase'])
+
+REPORT_IMPORTS = 15
+
+
+class StartupTimer:
+    """Records import times and named phase durations from install() on"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.records = []
+        self.phases = []
+        self.phase = "imports"
+        self.phase_start = self.start
+        self._local = threading.local()
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        stack = self._local.__dict__.setdefault("stack", [])
+        loaded = len(sys.modules)
+        start = time.perf_counter()
+        stack.append(0.0)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            # Imports of modules that were already loaded are only dict lookups
+            if len(sys.modules) != loaded:
+                self.records.append(ImportRecord(name, elapsed, elapsed - children,
+                                                 len(stack), self.phase))
+
+    def mark(self, next_phase):
+        """End the current phase and start timing next_phase"""
+        now = time.perf_counter()
+        self.phases.append((self.phase, now - self.phase_start))
+        self.phase = next_phase
+        self.phase_start = now
+
+    def finish(self):
+        """End the current phase; returns the total time since the timer started"""
+        self.mark(None)
+        self.uninstall()
+        return self.phase_start - self.start
+
+    def as_dict(self):
+        return {
+            "phases": [{"phase": phase, "seconds": seconds} for phase, seconds in self.phases],
+            "total": sum(seconds for _, seconds in self.phases),
+            "imports": [record._asdict() for record in self.records],
+        }
+
+    def format(self, top=REPORT_IMPORTS):
+        """Human-readable report: phase timings, then the slowest top-level imports"""
+        lines = ["Startup report", ""]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<24} {seconds * 1000:9.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        lines.append(f"  {'total':<24} {total * 1000:9.1f} ms")
+
+        lines += ["", f"Slowest imports (top {top}, cumulative | self):"]
+        outermost = [record for record in self.records if record.depth == 0]
+        for record in sorted(outermost, key=lambda record: -record.cumulative)[:top]:
+            lines.append(f"  {record.cumulative * 1000:9.1f} | {record.self * 1000:8.1f} ms"
+                         f"  {record.name}  [{record.phase}]")
+        return "\n".join(lines)
+
+    def write(self, path=None):
+        """Print the report, and save it as JSON when a path is given"""
+        print(self.format())
+        if path:
+            with open(path, "w") as fh:
+                json.dump(self.as_dict(), fh, indent=2)
@@ -0,0 +1,27 @@
+"""Tests for parsing the NumPy spellings of the old eval parser"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from volume_engine import compile_expression
+
+
+@pytest.mark.parametrize("source, expected", [
+    ("np.maximum(x, 1)", lambda x: np.maximum(x, 1)),
+    ("np.minimum(x, 1)", lambda x: np.minimum(x, 1)),
+    ("np.square(x)", np.square),
+    ("np.hypot(x, 2)", lambda x: np.hypot(x, 2)),
+    ("np.log1p(x)", np.log1p),
+    ("np.expm1(x)", np.expm1),
+    ("np.exp2(x)", np.exp2),
+    ("np.fabs(x - 1)", lambda x: np.fabs(x - 1)),
+    ("np.where(x < 1, x**2, 2 - x)", lambda x: np.where(x < 1, x**2, 2 - x)),
+])
+def test_numpy_spellings(source, expected):
+    x = np.linspace(0, 2, 9)
+    np.testing.assert_allclose(compile_expression(source)(x), expected(x))
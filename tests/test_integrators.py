@@ -0,0 +1,24 @@
+"""Regression tests for the volume integrators"""
+
+import os
+import math
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from volume_engine import integrate_gauss_kronrod, parse_functions, revolution_integrand
+
+
+def test_gauss_kronrod_rejects_nan_integrand():
+    # sqrt(x) is NaN on [-1, 0); this used to loop forever
+    integrand = revolution_integrand(parse_functions(["sqrt(x)"]), 0, 'x', 'disk')
+    with pytest.raises(ValueError, match="not finite"):
+        integrate_gauss_kronrod(integrand, -1, 1)
+
+
+def test_gauss_kronrod_disk_volume():
+    integrand = revolution_integrand(parse_functions(["x**2"]), 0, 'x', 'disk')
+    result = integrate_gauss_kronrod(integrand, 0, 2)
+    assert result.volume == pytest.approx(32 * math.pi / 5, rel=1e-9)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Volume of Revolution Calculator - OctoPrint stand-in
+
+A tiny local server speaking the parts of the OctoPrint REST API the print
+queue uses, for developing and testing without a printer:
+
+    python tools/octoprint_stub.py --port 5000 --api-key secret --directory uploads
+
+Uploads to POST /api/files/local are stored in --directory. A file uploaded
+with print=true becomes the current job reported by GET /api/job; GET
+/api/version answers like OctoPrint. Requests without the right X-Api-Key
+header get 403, and uploads that are neither G-code nor STL get 415.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import email.policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# File types OctoPrint accepts by default
+UPLOAD_EXTENSIONS = (".gcode", ".gco", ".g", ".stl")
+
+
+class OctoPrintStubHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients can reuse their connections
+    protocol_version = "HTTP/1.1"
+    server_version = "OctoPrintStub/1.0"
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self):
+        if self.headers.get("X-Api-Key") == self.server.api_key:
+            return True
+        self._reply(403, {"error": "Invalid API key"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/api/version":
+            self._reply(200, {"api": "0.1", "server": "1.9.0", "text": "OctoPrint stub"})
+        elif self.path == "/api/job":
+            with self.server.lock:
+                self._reply(200, dict(self.server.job))
+        else:
+            self._reply(404, {"error": "Not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if not self._authorized():
+            return
+        if self.path != "/api/files/local":
+            self._reply(404, {"error": "Not found"})
+            return
+
+        message = BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode("latin-1") + body)
+        fields, upload = {}, None
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename() is not None:
+                upload = (os.path.basename(part.get_filename()), part.get_payload(decode=True))
+            elif name:
+                fields[name] = part.get_content().strip()
+        if upload is None:
+            self._reply(400, {"error": "No file included"})
+            return
+
+        filename, data = upload
+        if not filename.lower().endswith(UPLOAD_EXTENSIONS):
+            self._reply(415, {"error": "Could not upload the file, its type is not supported"})
+            return
+        with open(os.path.join(self.server.directory, filename), "wb") as fh:
+            fh.write(data)
+        if fields.get("print") == "true":
+            with self.server.lock:
+                self.server.job = {"job": {"file": {"name": filename, "size": len(data)}},
+                                   "progress": {"completion": 0.0}, "state": "Printing",
+                                   "started": time.time()}
+        location = f"http://{self.headers.get('Host', 'localhost')}/api/files/local/{filename}"
+        self._reply(201, {"done": True,
+                          "files": {"local": {"name": filename, "origin": "local",
+                                              "refs": {"resource": location}}}})
+
+
+def make_server(host="127.0.0.1", port=5000, api_key="", directory="."):
+    """A ThreadingHTTPServer for the stub API (port 0 picks a free port)"""
+    os.makedirs(directory, exist_ok=True)
+    server = ThreadingHTTPServer((host, port), OctoPrintStubHandler)
+    server.api_key = api_key
+    server.directory = directory
+    server.lock = threading.Lock()
+    server.job = {"job": {"file": {"name": None}}, "progress": {"completion": None},
+                  "state": "Operational"}
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a minimal OctoPrint-compatible API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--api-key", default="", help="required X-Api-Key value")
+    parser.add_argument("--directory", "-d", default="uploads", help="where uploads are stored")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.api_key, args.directory)
+    print(f"OctoPrint stub on http://{args.host}:{server.server_address[1]} "
+          f"storing uploads in {args.directory}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())